@@ -0,0 +1,85 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from fastapi import Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from . import models
+from .database import get_db, get_dialect_insert
+from .firebase_config import verify_token
+
+# uid -> user id mappings never change once a user exists, so this only bounds memory and staleness
+USER_ID_CACHE_TTL_SECONDS = int(os.getenv("USER_ID_CACHE_TTL_SECONDS", "600"))
+USER_ID_CACHE_MAX_ENTRIES = int(os.getenv("USER_ID_CACHE_MAX_ENTRIES", "50000"))
+
+_user_ids = OrderedDict()  # firebase_uid -> (expires_at, user_id), least recently used first
+_user_ids_lock = threading.Lock()
+
+def upsert_user(db: Session, firebase_uid: str, email: str) -> models.User:
+    """
+    Returns the user for firebase_uid, creating it if needed. Users are only ever matched by UID: the
+    insert is ON CONFLICT (firebase_uid) DO NOTHING, so two first requests racing each other both end
+    up with the same row, while an email already registered under another UID is a 409. An existing
+    user costs one SELECT and no write.
+    """
+    user = db.query(models.User).filter(models.User.firebase_uid == firebase_uid).first()
+    if user is not None:
+        return user
+    # Tokens without an email (e.g. phone auth) store NULL, which never collides on the unique index
+    email = email or None
+    insert = get_dialect_insert()
+    try:
+        if insert is not None:
+            db.execute(
+                insert(models.User).values(firebase_uid=firebase_uid, email=email, is_active=True)
+                .on_conflict_do_nothing(index_elements=["firebase_uid"])
+            )
+            db.commit()
+        user = db.query(models.User).filter(models.User.firebase_uid == firebase_uid).first()
+        if user is None:
+            user = models.User(firebase_uid=firebase_uid, email=email, is_active=True)
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+    except IntegrityError:
+        db.rollback()
+        # Either a concurrent insert of this UID won (no ON CONFLICT support) or the email is taken
+        user = db.query(models.User).filter(models.User.firebase_uid == firebase_uid).first()
+        if user is None:
+            raise HTTPException(status_code=409, detail="Email is already registered to another account")
+    return user
+
+def get_current_user_id(
+    firebase_user: dict = Depends(verify_token),
+    db: Session = Depends(get_db)
+) -> int:
+    """The authenticated user's DB id, from the uid cache when warm (no query at all)."""
+    uid = firebase_user["uid"]
+    now = time.time()
+    with _user_ids_lock:
+        entry = _user_ids.get(uid)
+        if entry is not None and entry[0] > now:
+            _user_ids.move_to_end(uid)
+            return entry[1]
+
+    user_id = upsert_user(db, uid, firebase_user.get("email", "")).id
+    with _user_ids_lock:
+        _user_ids[uid] = (now + USER_ID_CACHE_TTL_SECONDS, user_id)
+        _user_ids.move_to_end(uid)
+        # Least recently used first, so a full cache sheds one idle user instead of everyone at once
+        while len(_user_ids) > USER_ID_CACHE_MAX_ENTRIES:
+            _user_ids.popitem(last=False)
+    return user_id
+
+def get_current_db_user(
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+) -> models.User:
+    """The full User row, for handlers that need more than the id."""
+    user = db.get(models.User, user_id)
+    if user is None:
+        with _user_ids_lock:
+            _user_ids.clear()
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
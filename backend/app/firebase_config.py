@@ -2,21 +2,34 @@ import firebase_admin
 from firebase_admin import credentials, auth
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import jwt, JWTError, ExpiredSignatureError
+from collections import OrderedDict
 import os
+import re
+import time
+import hashlib
+import threading
+import requests
 from dotenv import load_dotenv
-import json
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID")
+# Google's rotating x509 certs that sign Firebase ID tokens
+FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+# Refresh signing keys this long before Google's Cache-Control max-age says they expire
+SIGNING_KEYS_REFRESH_MARGIN = 300
+# An unknown key id forces at most one refetch per this many seconds; until then it is rejected
+SIGNING_KEYS_FORCED_REFETCH_SECONDS = float(os.getenv("SIGNING_KEYS_FORCED_REFETCH_SECONDS", "60"))
+
 # Initialize Firebase Admin
 cred = credentials.Certificate({
     "type": "service_account",
-    "project_id": os.getenv("FIREBASE_PROJECT_ID"),
+    "project_id": FIREBASE_PROJECT_ID,
     "private_key_id": os.getenv("FIREBASE_PRIVATE_KEY_ID"),
     "private_key": os.getenv("FIREBASE_PRIVATE_KEY").replace("\\n", "\n"),
     "client_email": os.getenv("FIREBASE_CLIENT_EMAIL"),
@@ -31,60 +44,174 @@ try:
     firebase_admin.initialize_app(cred)
     logger.info("Firebase Admin SDK initialized successfully")
 except ValueError as e:
-    logger.warning(f"Firebase Admin SDK already initialized: {str(e)}")
+    logger.warning("Firebase Admin SDK already initialized: %s", e)
 except Exception as e:
-    logger.error(f"Failed to initialize Firebase Admin SDK: {str(e)}")
+    logger.error("Failed to initialize Firebase Admin SDK: %s", e)
     raise
 
 # Security scheme for FastAPI
 security = HTTPBearer()
 
-async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# sha256(token) -> (exp, user_info); entries never outlive the token's own exp
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+_signing_keys = {"certs": {}, "expires_at": 0.0}
+_signing_keys_lock = threading.Lock()
+_refresher_started = False
+_last_forced_fetch = 0.0
+
+def _fetch_signing_keys():
+    response = requests.get(FIREBASE_CERTS_URL, timeout=10)
+    response.raise_for_status()
+    match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+    max_age = int(match.group(1)) if match else 3600
+    _signing_keys["certs"] = response.json()
+    _signing_keys["expires_at"] = time.time() + max_age
+    logger.debug("Fetched %d Firebase signing keys, valid for %ss", len(_signing_keys["certs"]), max_age)
+
+def _refresh_signing_keys_forever():
+    # Keeps keys fresh off the request path; a failed refresh is retried every 30s
+    while True:
+        delay = _signing_keys["expires_at"] - time.time() - SIGNING_KEYS_REFRESH_MARGIN
+        time.sleep(max(delay, 30))
+        try:
+            with _signing_keys_lock:
+                _fetch_signing_keys()
+        except Exception as e:
+            logger.warning("Refreshing Firebase signing keys failed: %s", e)
+
+def _get_signing_cert(kid: str):
+    global _refresher_started, _last_forced_fetch
+    if not _refresher_started:
+        with _signing_keys_lock:
+            if not _refresher_started:
+                _fetch_signing_keys()
+                threading.Thread(target=_refresh_signing_keys_forever, daemon=True, name="firebase-keys").start()
+                _refresher_started = True
+    cert = _signing_keys["certs"].get(kid)
+    if cert is None and time.time() - _last_forced_fetch >= SIGNING_KEYS_FORCED_REFETCH_SECONDS:
+        # Google may have rotated early; refetch once, but never block on (or repeat) a fetch another
+        # request already started, so made-up kids can't turn into one outbound call each
+        if _signing_keys_lock.acquire(blocking=False):
+            try:
+                if time.time() - _last_forced_fetch >= SIGNING_KEYS_FORCED_REFETCH_SECONDS:
+                    _last_forced_fetch = time.time()
+                    _fetch_signing_keys()
+            finally:
+                _signing_keys_lock.release()
+            cert = _signing_keys["certs"].get(kid)
+    return cert
+
+def _verify_locally(token: str):
+    """
+    Verifies a Firebase ID token against the cached signing keys with the same checks the Admin SDK
+    applies. Returns None when we can't decide locally (keys unreachable) so the caller can fall back
+    to auth.verify_id_token; a key id missing from freshly fetched keys is rejected.
+    """
+    if not FIREBASE_PROJECT_ID:
+        return None
+    try:
+        header = jwt.get_unverified_header(token)
+        cert = _get_signing_cert(header.get("kid"))
+    except JWTError:
+        raise auth.InvalidIdTokenError("Malformed ID token")
+    except Exception as e:
+        logger.warning("Firebase signing keys unavailable, falling back to Admin SDK: %s", e)
+        return None
+    if cert is None:
+        raise auth.InvalidIdTokenError("ID token signed with an unknown key")
+
+    try:
+        claims = jwt.decode(
+            token, cert, algorithms=["RS256"], audience=FIREBASE_PROJECT_ID,
+            issuer=f"https://securetoken.google.com/{FIREBASE_PROJECT_ID}",
+            options={"verify_at_hash": False}
+        )
+    except ExpiredSignatureError as e:
+        raise auth.ExpiredIdTokenError(str(e), e)
+    except JWTError as e:
+        raise auth.InvalidIdTokenError(str(e))
+
+    subject = claims.get("sub")
+    if not isinstance(subject, str) or not subject or len(subject) > 128:
+        raise auth.InvalidIdTokenError("ID token has an invalid subject")
+    if claims.get("iat", 0) > time.time() + 60 or claims.get("auth_time", 0) > time.time() + 60:
+        raise auth.InvalidIdTokenError("ID token was issued in the future")
+    claims["uid"] = subject
+    return claims
+
+def _cache_lookup(token_hash: str):
+    with _token_cache_lock:
+        entry = _token_cache.get(token_hash)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del _token_cache[token_hash]
+            return None
+        _token_cache.move_to_end(token_hash)
+        return entry[1]
+
+def _cache_store(token_hash: str, exp: float, user_info: dict):
+    with _token_cache_lock:
+        _token_cache[token_hash] = (exp, user_info)
+        while len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+            _token_cache.popitem(last=False)
+
+def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
         token = credentials.credentials
-        logger.debug(f"Received token: {token[:20]}...")
-        
+        token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+        cached = _cache_lookup(token_hash)
+        if cached is not None:
+            return cached
+
         # Verify the ID token
         try:
-            logger.debug("Attempting to verify ID token...")
-            decoded_token = auth.verify_id_token(token)
-            logger.debug(f"Successfully decoded token: {json.dumps(decoded_token, indent=2)}")
-            
+            decoded_token = _verify_locally(token)
+            if decoded_token is None:
+                decoded_token = auth.verify_id_token(token)
+
             # Extract user information
             user_info = {
                 "uid": decoded_token["uid"],
                 "email": decoded_token.get("email", ""),
                 "email_verified": decoded_token.get("email_verified", False)
             }
-            logger.debug(f"Extracted user info: {json.dumps(user_info, indent=2)}")
+            _cache_store(token_hash, decoded_token["exp"], user_info)
+            logger.debug("Verified ID token for uid %s", user_info["uid"])
             return user_info
-            
-        except auth.InvalidIdTokenError as e:
-            logger.error(f"Invalid ID token error: {str(e)}")
+
+        except auth.ExpiredIdTokenError as e:
+            logger.info("Expired ID token error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Invalid ID token: {str(e)}",
+                detail=f"Expired ID token: {str(e)}",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        except auth.ExpiredIdTokenError as e:
-            logger.error(f"Expired ID token error: {str(e)}")
+        except auth.InvalidIdTokenError as e:
+            logger.info("Invalid ID token error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Expired ID token: {str(e)}",
+                detail=f"Invalid ID token: {str(e)}",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Token verification error: {str(e)}")
+            logger.error("Token verification error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Token verification failed: {str(e)}",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-            
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"General error in verify_token: {str(e)}")
+        logger.error("General error in verify_token: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid authentication credentials: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
-        ) 
\ No newline at end of file
+        )
@@ -1,8 +1,20 @@
+import os
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import auth, watchlist, summaries, fetch, stock_details
+from .routers import auth, watchlist, summaries, fetch, stock_details, metrics, summarize
 
-app = FastAPI()
+# Sync handlers and dependencies (DB sessions, yfinance, SEC, OpenAI, Firebase) run on this many threads
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "64"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The limiter belongs to the running event loop, so it can only be sized once the loop is up
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -19,6 +31,8 @@ app.include_router(watchlist.router, tags=["watchlist"])
 app.include_router(summaries.router, tags=["summaries"])
 app.include_router(fetch.router, tags=["fetch"])
 app.include_router(stock_details.router, tags=["stock_details"])
+app.include_router(metrics.router, tags=["metrics"])
+app.include_router(summarize.router, prefix="/summarize", tags=["summarize"])
 
 @app.get("/")
 def read_root():
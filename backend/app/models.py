@@ -37,3 +37,51 @@ class Watchlist(Base):
     # Relationships
     user = relationship("User", back_populates="watchlist")
 
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    # sha256 of the full request (model, params, prompt incl. the sanitized chunk)
+    cache_key = Column(String(64), primary_key=True)
+    model = Column(String)
+    response_text = Column(Text)
+    size_bytes = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class FilingSection(Base):
+    __tablename__ = "filing_sections"
+
+    id = Column(Integer, primary_key=True, index=True)
+    accession = Column(String, index=True)
+    item_code = Column(String)
+    # sha256 of content; a section whose text matches one already summarized reuses that summary
+    content_hash = Column(String(64), index=True)
+    content = Column(Text)
+    summary_text = Column(Text, nullable=True)
+    # Prompt version (and extraction mode) the summary was made with; reuse across filings requires a match
+    summary_version = Column(String(32), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    summarized_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (UniqueConstraint('accession', 'item_code', name='_section_accession_item_uc'),)
+
+class SummaryJob(Base):
+    __tablename__ = "summary_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String, index=True)
+    filing_date = Column(Date)
+    filing_url = Column(String, nullable=True)
+    status = Column(String, default="queued", index=True)  # queued | running | done | failed
+    progress = Column(String, nullable=True)  # e.g. "fetching sections", "summarizing chunk 3/8"
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_after = Column(DateTime, default=datetime.utcnow, index=True)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (UniqueConstraint('ticker', 'filing_date', name='_job_ticker_filing_uc'),)
@@ -3,11 +3,12 @@ from sqlalchemy.orm import Session
 from .. import models, schemas
 from ..database import get_db
 from ..firebase_config import verify_token
+from ..dependencies import upsert_user, get_current_db_user
 
 router = APIRouter()
 
 @router.post("/users", response_model=schemas.User)
-async def create_user(
+def create_user(
     user: schemas.UserCreate,
     db: Session = Depends(get_db),
     firebase_user: dict = Depends(verify_token)
@@ -18,40 +19,10 @@ async def create_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Firebase UID mismatch"
         )
-    
-    # Check if user already exists
-    db_user = db.query(models.User).filter(
-        (models.User.email == user.email) | 
-        (models.User.firebase_uid == user.firebase_uid)
-    ).first()
-    
-    if db_user:
-        return db_user  # Return existing user instead of raising error
-    
-    # Create new user
-    db_user = models.User(
-        email=user.email,
-        firebase_uid=user.firebase_uid
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+
+    # Returns the existing user instead of raising if they're already registered
+    return upsert_user(db, user.firebase_uid, user.email)
 
 @router.get("/me", response_model=schemas.User)
-async def get_current_user(
-    db: Session = Depends(get_db),
-    firebase_user: dict = Depends(verify_token)
-):
-    user = db.query(models.User).filter(models.User.firebase_uid == firebase_user["uid"]).first()
-    if not user:
-        # If user doesn't exist in our database, create them
-        db_user = models.User(
-            email=firebase_user["email"],
-            firebase_uid=firebase_user["uid"]
-        )
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
-        return db_user
-    return user 
\ No newline at end of file
+def get_current_user(user: models.User = Depends(get_current_db_user)):
+    return user
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from app.services.fetcher import summarize_extracted_10q_sections
-import requests
-import yfinance as yf
+from app.services.cik_index import get_ciks, get_tickers_for_cik
+from app.services.quotes import get_bulk_quotes, MAX_SYMBOLS_PER_REQUEST
 
 router = APIRouter()
 
@@ -26,22 +26,29 @@ def summarize_by_ticker(req: TickerRequest):
 
 @router.get("/stock-prices")
 def stock_prices(symbols: str = Query(...)):
-    result = {}
-    for symbol in symbols.split(','):
-        try:
-            ticker = yf.Ticker(symbol)
-            fast_info = ticker.fast_info
-            price = fast_info.get("last_price") or 0
-            change = fast_info.get("last_change") or 0
-            change_percent = fast_info.get("last_change_percent") or 0
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error fetching {symbol}: {str(e)}")
-
-        result[symbol.upper()] = {
-            "price": price,
-            "change": change,
-            "changePercent": change_percent,
-        }
-    return result
-
-
+    symbol_list = [s for s in symbols.split(',') if s.strip()]
+    if len(symbol_list) > MAX_SYMBOLS_PER_REQUEST:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many symbols: {len(symbol_list)} requested, max is {MAX_SYMBOLS_PER_REQUEST}"
+        )
+    # Symbols that fail come back with an "error" field rather than failing the whole response
+    return get_bulk_quotes(symbol_list)
+
+
+@router.get("/cik-lookup")
+def cik_lookup(tickers: str = Query(None), ciks: str = Query(None)):
+    if not tickers and not ciks:
+        raise HTTPException(status_code=400, detail="Provide tickers and/or ciks")
+    try:
+        result = {}
+        if tickers:
+            result["tickers"] = get_ciks(t.strip() for t in tickers.split(',') if t.strip())
+        if ciks:
+            result["ciks"] = {
+                c.strip().zfill(10): get_tickers_for_cik(c.strip())
+                for c in ciks.split(',') if c.strip()
+            }
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"CIK index unavailable: {str(e)}")
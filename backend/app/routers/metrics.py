@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from app.services.submissions import get_submissions_cache_stats
+from app.services.llm_cache import get_llm_cache_stats
+from app.services.summarizer import get_llm_usage_stats
+from app.services.jobs import get_job_stats
+from app.services.quotes import get_quote_cache_stats
+from app.services.cache import get_cache_stats
+from app.services.snapshots import get_snapshot_stats
+from app.services.sec_http import get_sec_http_stats
+from app.services.circuit import get_circuit_stats
+from app.database import get_pool_stats
+
+router = APIRouter()
+
+@router.get("/metrics")
+def get_metrics():
+    return {
+        "submissions_cache": get_submissions_cache_stats(),
+        "llm_cache": get_llm_cache_stats(),
+        "llm_usage": get_llm_usage_stats(),
+        "summary_jobs": get_job_stats(),
+        "quote_cache": get_quote_cache_stats(),
+        "db_pool": get_pool_stats(),
+        "caches": get_cache_stats(),
+        "stock_snapshots": get_snapshot_stats(),
+        "sec_http": get_sec_http_stats(),
+        "circuits": get_circuit_stats(),
+    }
@@ -1,70 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+import os
+import json
+import time
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any
-import yfinance as yf
-from curl_cffi import requests as cffi_requests
+from sqlalchemy.orm import Session
+from ..database import get_db
 from ..firebase_config import verify_token
 from ..services.fetcher import (
     get_latest_10q_filing_info,
-    get_summary_from_db,
-    create_summary_placeholder,
-    run_ai_summary_and_save
+    get_summary_text,
+    claim_summary_generation
 )
-from datetime import datetime
+from ..services.jobs import enqueue_summary_job, get_summary_state
+from ..services.summary_events import subscribe
+from ..services.circuit import CircuitOpenError
+from ..services.snapshots import get_stock_snapshot
+from datetime import date, datetime
+
+# Without Redis the event stream checks one job row and one summary row per poll, server side
+SUMMARY_EVENTS_POLL_SECONDS = float(os.getenv("SUMMARY_EVENTS_POLL_SECONDS", "1"))
+SUMMARY_EVENTS_MAX_SECONDS = float(os.getenv("SUMMARY_EVENTS_MAX_SECONDS", "900"))
+SUMMARY_EVENTS_HEARTBEAT_SECONDS = 15
 
 router = APIRouter()
 
+# Plain def on purpose: yfinance, the SEC lookups and the DB session are all blocking, so FastAPI
+# runs this handler on the sized worker thread pool (see THREADPOOL_SIZE) instead of the event loop.
 @router.get("/stock/{ticker}")
-async def get_stock_details(ticker: str, background_tasks: BackgroundTasks, current_user: Dict[str, Any] = Depends(verify_token)):
+def get_stock_details(ticker: str, response: Response, current_user: Dict[str, Any] = Depends(verify_token), db: Session = Depends(get_db)):
+    # Summaries and jobs are keyed by the upper-cased ticker, so /stock/aapl and /stock/AAPL share them
+    ticker = ticker.strip().upper()
     print(f"[DEBUG] Starting stock details request for {ticker}")
     try:
-        # --- 1. Fetch real-time price data (this is always fast) ---
-        print(f"[DEBUG] Fetching price data for {ticker}")
-        
-        # Try with curl_cffi first, fallback to regular requests if it fails
-        try:
-            session = cffi_requests.Session()
-            session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'
-            session.impersonate = "chrome110"
-            stock = yf.Ticker(ticker, session=session)
-            info = stock.info
-        except Exception as e:
-            print(f"[DEBUG] curl_cffi failed for {ticker}, trying regular yfinance: {e}")
-            # Fallback to regular yfinance without custom session
-            stock = yf.Ticker(ticker)
-            info = stock.info
-        
+        # --- 1. Quote and filing metadata (stale-while-revalidate snapshot) ---
+        # A recent snapshot is served straight from the cache; a stale one is served too while a
+        # background refresh runs, so only a cold ticker waits on yfinance and the SEC.
+        print(f"[DEBUG] Getting stock snapshot for {ticker}")
+        snapshot = get_stock_snapshot(ticker)
+        response.headers["Age"] = str(int(snapshot["age_seconds"]))
+        response.headers["X-Data-Freshness"] = snapshot["freshness"]
+        # The summary field is a placeholder until generation finishes, so clients must always revalidate
+        response.headers["Cache-Control"] = "no-cache"
+
         price_data = {
-            "price": info.get("currentPrice", info.get("regularMarketPrice")),
-            "change": info.get("regularMarketChange", 0),
-            "changePercent": info.get("regularMarketChangePercent", 0),
-            "marketCap": info.get("marketCap", 0),
-            "peRatio": info.get("trailingPE", 0),
-            "eps": info.get("trailingEps", 0),
-            "volume": info.get("regularMarketVolume", 0),
-            "summary": "loading..."
+            **snapshot["quote"],
+            "summary": "loading...",
+            "filingDate": None
         }
-        print(f"[DEBUG] Price data fetched for {ticker}")
+        print(f"[DEBUG] Price data for {ticker} is {snapshot['freshness']} ({snapshot['age_seconds']:.0f}s old)")
 
         # --- 2. Handle the AI Summary (Asynchronously) ---
-        print(f"[DEBUG] Getting filing info for {ticker}")
-        filing_url, filing_date_str = get_latest_10q_filing_info(ticker)
+        filing_url, filing_date_str = snapshot["filing_url"], snapshot["filing_date"]
+        if filing_date_str is None:
+            raise Exception(f"No 10-Q filing information for {ticker}")
         filing_date = datetime.strptime(filing_date_str, "%Y-%m-%d").date()
+        price_data["filingDate"] = filing_date_str
         print(f"[DEBUG] Filing date for {ticker}: {filing_date}")
         
         print(f"[DEBUG] Checking database for existing summary")
-        summary_obj = get_summary_from_db(ticker, filing_date)
+        summary_text = get_summary_text(ticker, filing_date, db=db)
 
-        if summary_obj:
+        if summary_text is not None:
             # Case A: Summary is in the DB (either ready or still generating)
-            print(f"[DEBUG] Found existing summary for {ticker}: {summary_obj.summary_text[:50]}...")
-            price_data["summary"] = summary_obj.summary_text
+            print(f"[DEBUG] Found existing summary for {ticker}: {summary_text[:50]}...")
+            price_data["summary"] = summary_text
         else:
-            # Case B: No summary exists. Create a placeholder and start the background task.
-            print(f"[DEBUG] No existing summary found for {ticker}, creating placeholder and starting background task")
-            create_summary_placeholder(ticker, filing_date)
-            background_tasks.add_task(run_ai_summary_and_save, ticker, filing_date)
+            # Case B: No summary exists. Claim the generation; only the request whose claim lands queues the job.
+            if claim_summary_generation(ticker, filing_date, db=db):
+                print(f"[DEBUG] Claimed summary generation for {ticker}, queueing summary job")
+                enqueue_summary_job(ticker, filing_date, filing_url, db=db)
+            else:
+                print(f"[DEBUG] Summary generation for {ticker} already claimed by another request")
             price_data["summary"] = "generating..."
-            print(f"[DEBUG] Background task added for {ticker}")
 
         print(f"[DEBUG] Returning response for {ticker}")
         return price_data
@@ -76,4 +86,67 @@ async def get_stock_details(ticker: str, background_tasks: BackgroundTasks, curr
         if 'price_data' in locals() and price_data:
             price_data["summary"] = "Could not load AI summary."
             return price_data
-        raise HTTPException(status_code=404, detail=f"Could not fetch details for {ticker}: {str(e)}") 
\ No newline at end of file
+        if isinstance(e, CircuitOpenError):
+            # Upstream known to be down and nothing cached to fall back on: fail fast and say when to retry
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_in) + 1)})
+        raise HTTPException(status_code=404, detail=f"Could not fetch details for {ticker}: {str(e)}") 
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/stock/{ticker}/summary-events")
+def summary_events(
+    ticker: str,
+    filing_date: date = Query(None, description="Defaults to the latest 10-Q filing date"),
+    current_user: Dict[str, Any] = Depends(verify_token)
+):
+    """
+    Server-Sent Events stream of summary generation for (ticker, filing_date), replacing client polling
+    of /stock/{ticker}. Sends a "status" event on every change (queued, running + progress such as
+    "summarizing chunk 3/8"), then one final "done" (with the summary), "error", "missing" or "timeout".
+    """
+    ticker = ticker.strip().upper()
+    if filing_date is None:
+        try:
+            _, filing_date_str = get_latest_10q_filing_info(ticker)
+        except Exception as e:
+            raise HTTPException(status_code=404, detail=f"Could not find a 10-Q for {ticker}: {str(e)}")
+        filing_date = datetime.strptime(filing_date_str, "%Y-%m-%d").date()
+
+    async def stream():
+        started = last_sent = time.monotonic()
+        last_state = None
+        with subscribe(ticker, filing_date) as changed:
+            while True:
+                state = await run_in_threadpool(get_summary_state, ticker, filing_date)
+                state_key = (state["status"], state["progress"])
+                final = state["status"] in ("done", "error", "missing")
+                if state_key != last_state:
+                    payload = {"ticker": ticker, "filing_date": filing_date.isoformat(), **state}
+                    yield _sse(state["status"] if final else "status", payload)
+                    last_state, last_sent = state_key, time.monotonic()
+                if final:
+                    return
+                if time.monotonic() - started > SUMMARY_EVENTS_MAX_SECONDS:
+                    yield _sse("timeout", {"ticker": ticker, "filing_date": filing_date.isoformat()})
+                    return
+                if time.monotonic() - last_sent > SUMMARY_EVENTS_HEARTBEAT_SECONDS:
+                    # Comment line: keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    last_sent = time.monotonic()
+                if changed is None:
+                    # No Redis to push changes: fall back to polling the DB
+                    await asyncio.sleep(SUMMARY_EVENTS_POLL_SECONDS)
+                    continue
+                # Woken by a published change; the heartbeat timeout also re-reads the DB in case one was lost
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=SUMMARY_EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                changed.clear()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
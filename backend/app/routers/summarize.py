@@ -1,6 +1,12 @@
-from fastapi import APIRouter
+import json
+import hashlib
+from typing import Dict, Any
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from app.services.summarizer import summarize_transcript
+from app.firebase_config import verify_token
+from app.services import singleflight
+from app.services.summarizer import summarize_transcript, stream_summarize_transcript
 
 router = APIRouter()
 
@@ -13,6 +19,25 @@ class SummaryResponse(BaseModel):
     summary: str
 
 @router.post("/", response_model=SummaryResponse)
-async def summarize(req: SummaryRequest):
-    summary = summarize_transcript(req.transcript_text, req.ticker)
+def summarize(req: SummaryRequest, current_user: Dict[str, Any] = Depends(verify_token)):
+    # Identical requests arriving together (a double submit, a client retrying) share one run
+    key = ("summarize", req.ticker, hashlib.sha256(req.transcript_text.encode("utf-8")).hexdigest())
+    summary = singleflight.do(key, summarize_transcript, req.transcript_text, req.ticker)
     return SummaryResponse(ticker=req.ticker, summary=summary)
+
+@router.post("/stream")
+def summarize_stream(req: SummaryRequest, current_user: Dict[str, Any] = Depends(verify_token)):
+    """
+    Same summary as POST /, sent as newline-delimited JSON over a chunked response: one "chunk" line per
+    partial summary as it completes, "token" lines while the final summary is written, then "done".
+    """
+    def lines():
+        try:
+            for event in stream_summarize_transcript(req.transcript_text, req.ticker):
+                yield json.dumps({"ticker": req.ticker, **event}) + "\n"
+        except Exception as e:
+            # Headers are already sent, so the failure has to travel in-band
+            print(f"[ERROR] Streaming summary failed for {req.ticker}: {e}")
+            yield json.dumps({"ticker": req.ticker, "type": "error", "detail": str(e)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
@@ -3,76 +3,83 @@ from sqlalchemy.orm import Session
 from typing import List
 from .. import models, schemas
 from ..database import get_db
-from ..firebase_config import verify_token
+from ..dependencies import get_current_user_id
+from ..services.fetcher import get_latest_summaries, summary_status
+from ..services.quotes import get_bulk_quotes
 
 router = APIRouter()
 
 @router.get("/watchlist", response_model=List[schemas.Watchlist])
-async def get_watchlist(
+def get_watchlist(
     db: Session = Depends(get_db),
-    firebase_user: dict = Depends(verify_token)
+    user_id: int = Depends(get_current_user_id)
 ):
-    user = db.query(models.User).filter(models.User.firebase_uid == firebase_user["uid"]).first()
-    if not user:
-        # Create user if not exists
-        user = models.User(
-            firebase_uid=firebase_user["uid"],
-            email=firebase_user["email"],
-            is_active=True
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-    return db.query(models.Watchlist).filter(models.Watchlist.user_id == user.id).all()
+    return db.query(models.Watchlist).filter(models.Watchlist.user_id == user_id).all()
+
+@router.get("/watchlist/dashboard", response_model=List[schemas.DashboardItem])
+def get_watchlist_dashboard(
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Everything the dashboard shows in one round trip: the watchlist, a quote per ticker (one bulk
+    fetch, served from the quote cache when warm) and each ticker's latest summary status (one query).
+    """
+    items = db.query(models.Watchlist).filter(models.Watchlist.user_id == user_id).all()
+    tickers = [item.ticker.upper() for item in items]
+    summaries = get_latest_summaries(tickers, db=db)
+    try:
+        quotes = get_bulk_quotes(tickers)
+    except Exception as e:
+        # Quotes are best effort here; the watchlist itself should still load
+        print(f"[DEBUG] Dashboard quote fetch failed: {e}")
+        quotes = {}
+
+    dashboard = []
+    for item in items:
+        ticker = item.ticker.upper()
+        summary = summaries.get(ticker)
+        dashboard.append({
+            "id": item.id,
+            "ticker": item.ticker,
+            "added_at": item.added_at,
+            "user_id": item.user_id,
+            "quote": quotes.get(ticker) or {"error": "Quote unavailable"},
+            "summary": {
+                "filing_date": summary.filing_date if summary else None,
+                "status": summary_status(summary.summary_text if summary else None),
+                "created_at": summary.created_at if summary else None,
+            },
+        })
+    return dashboard
 
 @router.post("/watchlist", response_model=schemas.Watchlist)
-async def add_to_watchlist(
+def add_to_watchlist(
     watchlist_item: schemas.WatchlistCreate,
     db: Session = Depends(get_db),
-    firebase_user: dict = Depends(verify_token)
+    user_id: int = Depends(get_current_user_id)
 ):
-    user = db.query(models.User).filter(models.User.firebase_uid == firebase_user["uid"]).first()
-    if not user:
-        # Create user if not exists
-        user = models.User(
-            firebase_uid=firebase_user["uid"],
-            email=firebase_user["email"],
-            is_active=True
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
     # Check if ticker already exists in user's watchlist
     existing = db.query(models.Watchlist).filter(
-        models.Watchlist.user_id == user.id,
+        models.Watchlist.user_id == user_id,
         models.Watchlist.ticker == watchlist_item.ticker
     ).first()
     if existing:
         raise HTTPException(status_code=400, detail="Ticker already in watchlist")
-    db_watchlist = models.Watchlist(**watchlist_item.dict(), user_id=user.id)
+    db_watchlist = models.Watchlist(**watchlist_item.dict(), user_id=user_id)
     db.add(db_watchlist)
     db.commit()
     db.refresh(db_watchlist)
     return db_watchlist
 
 @router.delete("/watchlist/{ticker}")
-async def delete_from_watchlist(
+def delete_from_watchlist(
     ticker: str = Path(..., description="Ticker to remove from watchlist"),
     db: Session = Depends(get_db),
-    firebase_user: dict = Depends(verify_token)
+    user_id: int = Depends(get_current_user_id)
 ):
-    user = db.query(models.User).filter(models.User.firebase_uid == firebase_user["uid"]).first()
-    if not user:
-        user = models.User(
-            firebase_uid=firebase_user["uid"],
-            email=firebase_user["email"],
-            is_active=True
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
     watchlist_item = db.query(models.Watchlist).filter(
-        models.Watchlist.user_id == user.id,
+        models.Watchlist.user_id == user_id,
         models.Watchlist.ticker == ticker.upper()
     ).first()
     if not watchlist_item:
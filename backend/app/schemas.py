@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
-from typing import List, Optional
-from datetime import datetime
+from typing import Optional
+from datetime import date, datetime
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -55,4 +55,19 @@ class Watchlist(WatchlistBase):
     user_id: int
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class SummaryStatus(BaseModel):
+    filing_date: Optional[date] = None
+    status: str  # ready | generating | failed | missing
+    created_at: Optional[datetime] = None
+
+class Quote(BaseModel):
+    price: Optional[float] = None
+    change: Optional[float] = None
+    changePercent: Optional[float] = None
+    error: Optional[str] = None
+
+class DashboardItem(Watchlist):
+    quote: Quote
+    summary: SummaryStatus
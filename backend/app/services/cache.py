@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+try:
+    import redis
+except ImportError:  # Redis is optional; without it every cache is process-local
+    redis = None
+
+REDIS_URL = os.getenv("REDIS_URL")
+# Entries stored without a TTL still expire from Redis after this long, so nothing lives there forever
+REDIS_CACHE_DEFAULT_TTL_SECONDS = int(os.getenv("REDIS_CACHE_DEFAULT_TTL_SECONDS", str(7 * 24 * 3600)))
+REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "finagent")
+INVALIDATION_CHANNEL = f"{REDIS_KEY_PREFIX}:cache-invalidate"
+
+# Identifies this process on the invalidation channel so it ignores its own messages
+_process_id = uuid.uuid4().hex
+_caches = {}  # namespace -> cache, for stats and for routing invalidations
+_redis_client = None
+_redis_lock = threading.Lock()
+_subscriber_started = False
+
+class LocalCache:
+    """Thread-safe in-process LRU with a per-entry TTL (None = kept until evicted, <= 0 = not stored)."""
+
+    def __init__(self, namespace: str, max_entries: int):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at or None, value)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[0] is not None and entry[0] < time.time()):
+                if entry is not None:
+                    del self._entries[key]
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        if ttl is not None and ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + ttl if ttl is not None else None, value)
+            self._entries.move_to_end(key)
+            self.stats["sets"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        return {"backend": "local", "entries": len(self), **self.stats}
+
+class TieredCache:
+    """
+    Local LRU (L1) in front of Redis (L2). Reads try L1, then L2 (filling L1); writes go to both and
+    are announced on a pub/sub channel so other processes drop their now-stale L1 copy. Redis errors
+    are counted and otherwise ignored: the cache degrades to L1 only instead of failing requests.
+    """
+
+    def __init__(self, namespace: str, max_entries: int, client):
+        self.namespace = namespace
+        self.local = LocalCache(namespace, max_entries)
+        self._client = client
+        self.stats = {"l2_hits": 0, "l2_misses": 0, "l2_errors": 0, "invalidations_received": 0}
+
+    def _key(self, key: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{self.namespace}:{key}"
+
+    def _publish(self, key: str):
+        self._client.publish(INVALIDATION_CHANNEL, json.dumps({"ns": self.namespace, "key": key, "from": _process_id}))
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        try:
+            pipe = self._client.pipeline()
+            pipe.get(self._key(key))
+            pipe.pttl(self._key(key))
+            raw, ttl_ms = pipe.execute()
+        except Exception as e:
+            self.stats["l2_errors"] += 1
+            print(f"[DEBUG] Redis get failed for {self.namespace}:{key}: {e}")
+            return None
+        if raw is None:
+            self.stats["l2_misses"] += 1
+            return None
+        self.stats["l2_hits"] += 1
+        value = json.loads(raw)
+        # L1 copy expires with the shared one
+        self.local.set(key, value, ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else None)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        if ttl is not None and ttl <= 0:
+            return
+        self.local.set(key, value, ttl)
+        try:
+            ttl = ttl if ttl is not None else REDIS_CACHE_DEFAULT_TTL_SECONDS
+            self._client.set(self._key(key), json.dumps(value), px=max(1, int(ttl * 1000)))
+            self._publish(key)
+        except Exception as e:
+            self.stats["l2_errors"] += 1
+            print(f"[DEBUG] Redis set failed for {self.namespace}:{key}: {e}")
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        try:
+            self._client.delete(self._key(key))
+            self._publish(key)
+        except Exception as e:
+            self.stats["l2_errors"] += 1
+            print(f"[DEBUG] Redis delete failed for {self.namespace}:{key}: {e}")
+
+    def __len__(self):
+        return len(self.local)
+
+    def get_stats(self) -> dict:
+        stats = self.local.get_stats()
+        stats["backend"] = "local+redis"
+        stats["l1_hits"], stats["l1_misses"] = stats.pop("hits"), stats.pop("misses")
+        return {**stats, **self.stats}
+
+def get_redis_client():
+    global _redis_client
+    if _redis_client is None and REDIS_URL and redis is not None:
+        with _redis_lock:
+            if _redis_client is None:
+                _redis_client = redis.Redis.from_url(REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+    return _redis_client
+
+def _listen_for_invalidations():
+    # Reconnects forever: a Redis restart must not leave L1 caches un-invalidated for good
+    reconnecting = False
+    while True:
+        try:
+            pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            if reconnecting:
+                # Invalidations published while we were away are lost, so nothing in L1 can be trusted
+                for cache in list(_caches.values()):
+                    if isinstance(cache, TieredCache):
+                        cache.local.clear()
+                reconnecting = False
+            while True:
+                # Polled with a wait shorter than the client's socket_timeout: a quiet channel is not an error
+                message = pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                data = json.loads(message["data"])
+                cache = _caches.get(data["ns"])
+                if data["from"] != _process_id and isinstance(cache, TieredCache):
+                    cache.local.delete(data["key"])
+                    cache.stats["invalidations_received"] += 1
+        except Exception as e:
+            print(f"[DEBUG] Cache invalidation listener lost Redis ({e}), reconnecting in 5s")
+            reconnecting = True
+            time.sleep(5)
+
+def _start_subscriber():
+    global _subscriber_started
+    with _redis_lock:
+        if not _subscriber_started:
+            threading.Thread(target=_listen_for_invalidations, daemon=True, name="cache-invalidation").start()
+            _subscriber_started = True
+
+def get_cache(namespace: str, max_entries: int):
+    """
+    The cache for namespace: local LRU + Redis when REDIS_URL is set (and the redis package is
+    installed), otherwise a local LRU. Values must be JSON-serializable.
+    """
+    cache = _caches.get(namespace)
+    if cache is not None:
+        return cache
+    client = get_redis_client()
+    if client is not None:
+        cache = TieredCache(namespace, max_entries, client)
+        _start_subscriber()
+    else:
+        cache = LocalCache(namespace, max_entries)
+    return _caches.setdefault(namespace, cache)
+
+def get_cache_stats() -> Dict[str, dict]:
+    return {namespace: cache.get_stats() for namespace, cache in _caches.items()}
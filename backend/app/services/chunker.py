@@ -0,0 +1,117 @@
+import os
+import re
+from typing import Callable, Iterator
+from app.services.sanitizer import PARAGRAPH_BREAK, PARAGRAPH_SEPARATOR
+
+# Target size of each chunk sent to summarize_chunk, in model tokens
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "3000"))
+# A "## Section:" marker starts a new chunk once the current one is at least this full
+CHUNK_SECTION_BREAK_FILL = float(os.getenv("CHUNK_SECTION_BREAK_FILL", "0.5"))
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+
+SECTION_MARKER = re.compile(r"(?=## Section: )")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?;])\s+")
+# Rough BPE pieces: words, digit runs of up to 3, single punctuation marks
+_APPROX_PIECES = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+def approximate_token_count(text: str) -> int:
+    """
+    Tokenizer-free estimate used when tiktoken isn't installed. Numbers and table punctuation
+    are counted piece by piece, which is what makes 10-Q text denser than its word count suggests.
+    """
+    count = 0
+    for piece in _APPROX_PIECES.findall(text):
+        count += 1 + len(piece) // 8
+    return count
+
+def _load_default_tokenizer() -> Callable[[str], int]:
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        print(f"[DEBUG] tiktoken unavailable ({e}), using approximate token counts")
+        return approximate_token_count
+
+_tokenizer = None
+
+def set_tokenizer(tokenizer: Callable[[str], int]):
+    """Plug in a different local token counter (anything mapping text -> token count)."""
+    global _tokenizer
+    _tokenizer = tokenizer
+
+def count_tokens(text: str) -> int:
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = _load_default_tokenizer()
+    return _tokenizer(text)
+
+def _iter_pieces(text: str, pattern: re.Pattern) -> Iterator[str]:
+    # Lazy split: finditer walks the string without building the full list of parts
+    start = 0
+    for match in pattern.finditer(text):
+        if match.start() > start:
+            yield text[start:match.start()]
+        start = match.end()
+    if start < len(text):
+        yield text[start:]
+
+def _iter_units(section: str, max_tokens: int) -> Iterator[tuple]:
+    """
+    Yields (text, tokens, separator) units no larger than max_tokens: paragraphs, else sentences, else
+    word runs. separator is what joins the unit to the one before it in a chunk: a blank line when the
+    unit starts a paragraph, otherwise a space.
+    """
+    for paragraph in _iter_pieces(section, PARAGRAPH_BREAK):
+        separator = PARAGRAPH_SEPARATOR
+        tokens = count_tokens(paragraph)
+        if tokens <= max_tokens:
+            yield paragraph, tokens, separator
+            continue
+        for sentence in _iter_pieces(paragraph, SENTENCE_BREAK):
+            tokens = count_tokens(sentence)
+            if tokens <= max_tokens:
+                yield sentence, tokens, separator
+                separator = " "
+                continue
+            words, words_tokens = [], 0
+            for word in sentence.split():
+                word_tokens = count_tokens(word)
+                if words and words_tokens + word_tokens > max_tokens:
+                    yield " ".join(words), words_tokens, separator
+                    separator = " "
+                    words, words_tokens = [], 0
+                words.append(word)
+                words_tokens += word_tokens
+            if words:
+                yield " ".join(words), words_tokens, separator
+                separator = " "
+
+def iter_token_chunks(text: str, max_tokens: int = None) -> Iterator[str]:
+    """
+    Packs text into chunks of up to max_tokens, breaking at "## Section:" markers when the current
+    chunk is already reasonably full, otherwise at paragraph, then sentence, then word boundaries.
+    Paragraphs (and sections) that share a chunk stay separated by a blank line.
+    """
+    max_tokens = max_tokens or CHUNK_MAX_TOKENS
+    current, current_tokens = [], 0
+    for section in _iter_pieces(text, SECTION_MARKER):
+        section = section.strip()
+        if not section:
+            continue
+        if current and current_tokens >= max_tokens * CHUNK_SECTION_BREAK_FILL:
+            yield "".join(current)
+            current, current_tokens = [], 0
+        for unit, tokens, separator in _iter_units(section, max_tokens):
+            # BPE folds a joining space into the next word, but a blank line is a token of its own
+            joint_tokens = 1 if separator == PARAGRAPH_SEPARATOR else 0
+            if current and current_tokens + joint_tokens + tokens > max_tokens:
+                yield "".join(current)
+                current, current_tokens = [], 0
+            if current:
+                current.append(separator)
+                current_tokens += joint_tokens
+            current.append(unit)
+            current_tokens += tokens
+    if current:
+        yield "".join(current)
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional
+from app.services.cache import get_cache
+from app.services.sec_http import sec_get
+
+CIK_LOOKUP_URL = "https://www.sec.gov/include/ticker.txt"
+
+# How long a downloaded ticker.txt is trusted before we revalidate it with the SEC
+CIK_INDEX_TTL_SECONDS = int(os.getenv("CIK_INDEX_TTL_SECONDS", "86400"))
+# Local copy of the index so a fresh process doesn't have to hit the SEC before its first lookup
+CIK_INDEX_CACHE_PATH = os.getenv(
+    "CIK_INDEX_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "finagent_cik_index.json")
+)
+
+# Process-wide index state. Readers never take the lock; only refreshes do.
+_index = {
+    "ticker_to_cik": None,   # {"AAPL": "0000320193", ...}
+    "cik_to_tickers": None,  # {"0000320193": ["AAPL"], ...}
+    "fetched_at": 0.0,
+    "etag": None,
+    "last_modified": None,
+}
+_refresh_lock = threading.Lock()
+# The whole index under one key, so processes behind the same Redis download ticker.txt once between them
+_shared = get_cache("cik_index", 1)
+
+
+def _parse_ticker_txt(text: str) -> Dict[str, str]:
+    mapping = {}
+    for line in text.splitlines():
+        parts = line.strip().split('\t')
+        if len(parts) != 2:
+            continue
+        mapping[parts[0].upper()] = parts[1].strip().zfill(10)
+    return mapping
+
+
+def _set_mapping(mapping: Dict[str, str]):
+    reverse = {}
+    for ticker, cik in mapping.items():
+        reverse.setdefault(cik, []).append(ticker)
+    # Swap both dicts in one step so readers never see a half-built index
+    _index["ticker_to_cik"], _index["cik_to_tickers"] = mapping, reverse
+
+
+def _load_from_disk() -> bool:
+    try:
+        with open(CIK_INDEX_CACHE_PATH, "r") as f:
+            data = json.load(f)
+        _set_mapping(data["mapping"])
+        _index["fetched_at"] = data.get("fetched_at", 0.0)
+        _index["etag"] = data.get("etag")
+        _index["last_modified"] = data.get("last_modified")
+        print(f"[DEBUG] Loaded CIK index from {CIK_INDEX_CACHE_PATH} ({len(data['mapping'])} tickers)")
+        return True
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"[DEBUG] Ignoring unreadable CIK index cache {CIK_INDEX_CACHE_PATH}: {e}")
+        return False
+
+
+def _save_to_disk():
+    data = {
+        "mapping": _index["ticker_to_cik"],
+        "fetched_at": _index["fetched_at"],
+        "etag": _index["etag"],
+        "last_modified": _index["last_modified"],
+    }
+    tmp_path = f"{CIK_INDEX_CACHE_PATH}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, CIK_INDEX_CACHE_PATH)
+    except Exception as e:
+        print(f"[DEBUG] Could not persist CIK index to {CIK_INDEX_CACHE_PATH}: {e}")
+
+
+def _load_from_shared_cache() -> bool:
+    data = _shared.get("index")
+    if data is None or data.get("fetched_at", 0.0) <= _index["fetched_at"]:
+        return False
+    _set_mapping(data["mapping"])
+    _index["fetched_at"] = data["fetched_at"]
+    _index["etag"] = data.get("etag")
+    _index["last_modified"] = data.get("last_modified")
+    print(f"[DEBUG] Loaded CIK index from the shared cache ({len(data['mapping'])} tickers)")
+    return True
+
+
+def _download():
+    headers = {}
+    if _index["ticker_to_cik"] is not None:
+        if _index["etag"]:
+            headers["If-None-Match"] = _index["etag"]
+        if _index["last_modified"]:
+            headers["If-Modified-Since"] = _index["last_modified"]
+
+    response = sec_get(CIK_LOOKUP_URL, headers=headers)
+    if response.status_code == 304:
+        print("[DEBUG] CIK index not modified, extending TTL")
+    elif response.status_code == 200:
+        _set_mapping(_parse_ticker_txt(response.text))
+        _index["etag"] = response.headers.get("ETag")
+        _index["last_modified"] = response.headers.get("Last-Modified")
+        print(f"[DEBUG] Downloaded CIK index ({len(_index['ticker_to_cik'])} tickers)")
+    else:
+        raise Exception("Failed to fetch CIK mapping")
+
+    _index["fetched_at"] = time.time()
+    _save_to_disk()
+    _shared.set("index", {
+        "mapping": _index["ticker_to_cik"],
+        "fetched_at": _index["fetched_at"],
+        "etag": _index["etag"],
+        "last_modified": _index["last_modified"],
+    })
+
+
+def refresh_cik_index(force: bool = False):
+    """
+    Makes sure the in-memory index is loaded and no older than CIK_INDEX_TTL_SECONDS.
+    If another thread is already refreshing and we have data, the current index is served as-is.
+    """
+    if not force and _index["ticker_to_cik"] is not None \
+            and time.time() - _index["fetched_at"] < CIK_INDEX_TTL_SECONDS:
+        return
+
+    have_data = _index["ticker_to_cik"] is not None
+    if not _refresh_lock.acquire(blocking=not have_data):
+        return
+    try:
+        if _index["ticker_to_cik"] is None:
+            _load_from_disk()
+        if not force:
+            # Another process may have refreshed it already
+            _load_from_shared_cache()
+        if not force and _index["ticker_to_cik"] is not None \
+                and time.time() - _index["fetched_at"] < CIK_INDEX_TTL_SECONDS:
+            return
+        try:
+            _download()
+        except Exception as e:
+            if _index["ticker_to_cik"] is None:
+                raise
+            # A stale index is far better than failing every lookup while the SEC is unreachable
+            print(f"[DEBUG] CIK index refresh failed, serving stale index: {e}")
+    finally:
+        _refresh_lock.release()
+
+
+def get_cik(ticker: str) -> Optional[str]:
+    refresh_cik_index()
+    return _index["ticker_to_cik"].get(ticker.upper())
+
+
+def get_ciks(tickers: Iterable[str]) -> Dict[str, Optional[str]]:
+    refresh_cik_index()
+    mapping = _index["ticker_to_cik"]
+    return {ticker.upper(): mapping.get(ticker.upper()) for ticker in tickers}
+
+
+def get_tickers_for_cik(cik) -> List[str]:
+    refresh_cik_index()
+    return list(_index["cik_to_tickers"].get(str(cik).zfill(10), []))
@@ -0,0 +1,117 @@
+import os
+import time
+import threading
+from typing import Callable, Dict
+
+# Consecutive failures that open a circuit, and how long it stays open before one probe is let through
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+_breakers = {}
+_registry_lock = threading.Lock()
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """
+    closed: calls go through and consecutive failures are counted; `failure_threshold` in a row opens it.
+    open: calls fail at once with CircuitOpenError for `reset_seconds`.
+    half_open: a single probe call is let through; success closes the circuit, failure reopens it. A
+    probe that never reports back is given up on after `reset_seconds`, so a lost outcome can't wedge
+    the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_seconds: float = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or CIRCUIT_FAILURE_THRESHOLD
+        self.reset_seconds = reset_seconds or CIRCUIT_RESET_SECONDS
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "trips": 0}
+
+    def before_call(self):
+        """Raises CircuitOpenError if the call must not be made; otherwise the caller must record its outcome."""
+        with self._lock:
+            if self.state == "open":
+                retry_in = self._opened_at + self.reset_seconds - time.monotonic()
+                if retry_in > 0:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpenError(self.name, retry_in)
+                self.state = "half_open"
+                print(f"[DEBUG] Circuit {self.name} half-open, probing upstream")
+            if self.state == "half_open":
+                probe_age = time.monotonic() - self._probe_started
+                if self._probing and probe_age < self.reset_seconds:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpenError(self.name, self.reset_seconds - probe_age)
+                self._probing, self._probe_started = True, time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            self.stats["successes"] += 1
+            if self.state != "closed":
+                print(f"[DEBUG] Circuit {self.name} closed, upstream recovered")
+            self.state, self._failures, self._probing = "closed", 0, False
+
+    def record_failure(self):
+        with self._lock:
+            self.stats["failures"] += 1
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.stats["trips"] += 1
+                    print(f"[DEBUG] Circuit {self.name} opened after {self._failures} consecutive failures")
+                self.state, self._opened_at, self._probing = "open", time.monotonic(), False
+
+    def release_probe(self):
+        """For a call that ended without saying anything about the upstream: lets the next call probe."""
+        with self._lock:
+            self._probing = False
+
+    def call(self, fn: Callable, *args, is_failure: Callable[[Exception], bool] = None, **kwargs):
+        """
+        fn(*args, **kwargs) through the breaker. An exception counts against the upstream only if
+        is_failure(exception) says so (default: any exception); a 4xx-style error means it answered.
+        """
+        self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            # e.g. KeyboardInterrupt: no verdict on the upstream, but the probe slot must be freed
+            self.release_probe()
+            raise
+        self.record_success()
+        return result
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = {"state": self.state, "consecutive_failures": self._failures, **self.stats}
+            if self.state == "open":
+                stats["retry_in_seconds"] = round(max(0.0, self._opened_at + self.reset_seconds - time.monotonic()), 1)
+        return stats
+
+def get_breaker(name: str, failure_threshold: int = None, reset_seconds: float = None) -> CircuitBreaker:
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, reset_seconds)
+        return breaker
+
+def get_circuit_stats() -> Dict[str, dict]:
+    return {name: breaker.get_stats() for name, breaker in _breakers.items()}
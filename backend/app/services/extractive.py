@@ -0,0 +1,109 @@
+import os
+import re
+import numpy as np
+from app.services.chunker import count_tokens
+from app.services.sanitizer import PARAGRAPH_BREAK, PARAGRAPH_SEPARATOR
+
+# Pre-ranking keeps the most informative sentences of each section before anything goes to the LLM.
+# Off until its effect on summary quality has been measured on real filings (see compare_extractive.py)
+EXTRACTIVE_PRERANK = os.getenv("EXTRACTIVE_PRERANK", "false").lower() == "true"
+# Per-section budget in model tokens; sections already under it pass through untouched
+EXTRACTIVE_SECTION_TOKEN_BUDGET = int(os.getenv("EXTRACTIVE_SECTION_TOKEN_BUDGET", "1500"))
+# How much a sentence's share of figures ($, %, amounts) boosts its score
+EXTRACTIVE_NUMERIC_WEIGHT = float(os.getenv("EXTRACTIVE_NUMERIC_WEIGHT", "1.0"))
+
+# Sentence ends, and line breaks (headings and table rows rarely end in punctuation)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"“($])|\s*\n\s*")
+_WORD = re.compile(r"[a-z][a-z'\-]+")
+_FIGURE = re.compile(r"[$€£]?\(?\d[\d,]*(?:\.\d+)?%?\)?")
+# Sentences with fewer words than this are headings or table fragments
+_MIN_PROSE_WORDS = 5
+_STOPWORDS = frozenset("""
+    a about above after all also an and any are as at be been before being below between both but by
+    can could did do does during each for from had has have having he her here his how if in into is
+    it its itself may might more most much must no nor not of off on once only or other our ours out
+    over own same she should so some such than that the their them then there these they this those
+    through to too under until up very was we were what when where which while who whom why will with
+    would you your
+""".split())
+
+def split_sentences(text: str) -> list:
+    sentences = []
+    for piece in _SENTENCE_SPLIT.split(text):
+        sentence = " ".join(piece.split())
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+def score_sentences(sentences: list) -> np.ndarray:
+    """
+    TF-IDF mass of each sentence (sentences as documents), normalized by sqrt(length) so long sentences
+    don't win on size alone, boosted by figure density for prose and damped for table fragments.
+    """
+    count = len(sentences)
+    terms = [[w for w in _WORD.findall(s.lower()) if w not in _STOPWORDS] for s in sentences]
+    lengths = np.fromiter((len(t) for t in terms), dtype=np.int64, count=count)
+    figures = np.fromiter((len(_FIGURE.findall(s)) for s in sentences), dtype=np.int64, count=count)
+
+    scores = np.zeros(count)
+    flat_terms = [w for t in terms for w in t]
+    if flat_terms:
+        vocab, term_ids = np.unique(np.array(flat_terms), return_inverse=True)
+        vocab_size = len(vocab)
+        sentence_ids = np.repeat(np.arange(count, dtype=np.int64), lengths)
+        # Document frequency = number of distinct (sentence, term) pairs per term
+        pairs = np.unique(sentence_ids * vocab_size + term_ids)
+        df = np.bincount(pairs % vocab_size, minlength=vocab_size)
+        idf = np.log((1 + count) / (1 + df)) + 1
+        mass = np.bincount(sentence_ids, weights=idf[term_ids], minlength=count)
+        scores = mass / np.sqrt(np.maximum(lengths, 1))
+
+    # Figures carry the facts in a 10-Q, but a table row is all figures and no context: only prose
+    # gets the boost, and short fragments are damped so they rarely beat a real sentence
+    prose = lengths >= _MIN_PROSE_WORDS
+    density = figures / np.maximum(lengths + figures, 1)
+    scores *= 1 + EXTRACTIVE_NUMERIC_WEIGHT * np.where(prose, np.minimum(density, 0.5), 0)
+    scores[~prose] *= 0.25
+    return scores
+
+def prerank_section(text: str, token_budget: int = None) -> str:
+    """
+    The highest-scoring sentences of text that fit in token_budget, in their original order and with
+    the paragraph breaks between them kept. Text already within the budget is returned as is.
+    """
+    token_budget = token_budget or EXTRACTIVE_SECTION_TOKEN_BUDGET
+    if count_tokens(text) <= token_budget:
+        return text
+    # Repeated boilerplate (captions, legends, disclaimers) would otherwise score identically every time,
+    # so only a sentence's first occurrence is kept, along with the paragraph it came from
+    first_paragraph = {}
+    for paragraph_index, paragraph in enumerate(PARAGRAPH_BREAK.split(text)):
+        for sentence in split_sentences(paragraph):
+            first_paragraph.setdefault(sentence, paragraph_index)
+    sentences = list(first_paragraph)
+    if not sentences:
+        return text
+
+    scores = score_sentences(sentences)
+    tokens = np.fromiter((count_tokens(s) for s in sentences), dtype=np.int64, count=len(sentences))
+    # Fill the budget best-first, skipping any sentence that no longer fits
+    kept, used = [], 0
+    for index in np.argsort(-scores, kind="stable"):
+        if used + tokens[index] <= token_budget:
+            kept.append(index)
+            used += tokens[index]
+    parts, previous = [], None
+    for index in sorted(kept):
+        paragraph_index = first_paragraph[sentences[index]]
+        if previous is not None:
+            parts.append(" " if paragraph_index == previous else PARAGRAPH_SEPARATOR)
+        parts.append(sentences[index])
+        previous = paragraph_index
+    return "".join(parts)
+
+def prerank_sections(sections: dict, token_budget: int = None) -> dict:
+    ranked = {code: prerank_section(content, token_budget) for code, content in sections.items()}
+    before = sum(count_tokens(c) for c in sections.values())
+    after = sum(count_tokens(c) for c in ranked.values())
+    print(f"[DEBUG] Extractive pre-ranking kept {after}/{before} tokens across {len(sections)} sections")
+    return ranked
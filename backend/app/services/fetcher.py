@@ -1,9 +1,23 @@
 import os
-import requests
-from app.services.summarizer import summarize_transcript
+import math
+from concurrent.futures import ThreadPoolExecutor, wait
+from app.services.summarizer import summarize_transcript, summarize_sections, combine_summaries, SUMMARY_PROMPT_VERSION
+from app.services.cik_index import get_cik
+from app.services.submissions import get_latest_filing
+from app.services.extractive import prerank_sections, EXTRACTIVE_PRERANK
+from app.services.sections import (
+    accession_from_url, get_stored_sections, store_section, find_summary_by_hash, store_section_summary
+)
+from app.services import singleflight
+from app.services.cache import get_cache
+from app.services.summary_events import publish_summary_event
+from app.services.sec_http import sec_get
 from dotenv import load_dotenv
-from app.models import Summary
-from app.database import SessionLocal
+from app.models import Summary, SummaryJob
+from app.database import get_dialect_insert, session_scope
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from datetime import date, datetime
 
 # Load environment variables
@@ -12,9 +26,15 @@ load_dotenv()
 # Debug environment variables
 SEC_API_KEY = os.getenv("SEC_API_KEY")
 EXTRACTOR_API = "https://api.sec-api.io/extractor"
-CIK_LOOKUP_URL = "https://www.sec.gov/include/ticker.txt"
-EDGAR_SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
-HEADERS = {"User-Agent": "YourAppName/1.0"}
+# How many sections of one filing are extracted at once, and how long each one may take
+SECTION_FETCH_CONCURRENCY = int(os.getenv("SECTION_FETCH_CONCURRENCY", "5"))
+SECTION_FETCH_TIMEOUT = float(os.getenv("SECTION_FETCH_TIMEOUT", "60"))
+# Finished summaries never change, so they're cached (and shared through Redis) without a TTL
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000"))
+
+_summary_cache = get_cache("summaries", SUMMARY_CACHE_MAX_ENTRIES)
+# Pre-ranking changes what the LLM sees, so it is part of what a section summary was made with
+SECTION_SUMMARY_VERSION = SUMMARY_PROMPT_VERSION + ("+prerank" if EXTRACTIVE_PRERANK else "")
 
 # Most important 10-Q sections for investors
 IMPORTANT_10Q_ITEMS = [
@@ -26,62 +46,35 @@ IMPORTANT_10Q_ITEMS = [
 ]
 
 def get_cik_from_ticker(ticker: str) -> str:
-    response = requests.get(CIK_LOOKUP_URL, headers=HEADERS)
-    if response.status_code != 200:
-        raise Exception("Failed to fetch CIK mapping")
-    lines = response.text.splitlines()
-    mapping = {line.split('\t')[0].upper(): line.split('\t')[1].zfill(10) for line in lines}
-    return mapping.get(ticker.upper())
+    # Served from the process-wide index in cik_index; ticker.txt is only re-downloaded when its TTL lapses
+    return get_cik(ticker)
 
-def get_latest_10q_filing_url(ticker: str) -> str:
+def get_latest_10q_filing(ticker: str) -> dict:
     cik = get_cik_from_ticker(ticker)
     if not cik:
         raise Exception(f"CIK not found for ticker {ticker}")
 
-    url = EDGAR_SUBMISSIONS_URL.format(cik=cik)
-    res = requests.get(url, headers=HEADERS)
-    if res.status_code != 200:
-        raise Exception("Failed to fetch filings from SEC")
+    # Served from the submissions cache; repeat lookups inside its TTL cost no SEC round trip
+    filing = get_latest_filing(cik, "10-Q")
+    if not filing:
+        raise Exception(f"No recent 10-Q found for ticker {ticker}")
+    return filing
 
-    data = res.json()
-    filings = data.get("filings", {}).get("recent", {})
-    for i, form in enumerate(filings.get("form", [])):
-        if form == "10-Q":
-            accession = filings["accessionNumber"][i].replace("-", "")
-            primary_doc = filings["primaryDocument"][i]
-            return f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{accession}/{primary_doc}"
-
-    raise Exception(f"No recent 10-Q found for ticker {ticker}")
+def get_latest_10q_filing_url(ticker: str) -> str:
+    return get_latest_10q_filing(ticker)["url"]
 
 def get_latest_10q_filing_info(ticker: str):
-    cik = get_cik_from_ticker(ticker)
-    if not cik:
-        raise Exception(f"CIK not found for ticker {ticker}")
+    filing = get_latest_10q_filing(ticker)
+    return filing["url"], filing["filing_date"]
 
-    url = EDGAR_SUBMISSIONS_URL.format(cik=cik)
-    res = requests.get(url, headers=HEADERS)
-    if res.status_code != 200:
-        raise Exception("Failed to fetch filings from SEC")
-
-    data = res.json()
-    filings = data.get("filings", {}).get("recent", {})
-    for i, form in enumerate(filings.get("form", [])):
-        if form == "10-Q":
-            accession = filings["accessionNumber"][i].replace("-", "")
-            primary_doc = filings["primaryDocument"][i]
-            filing_date = filings["filingDate"][i]  # YYYY-MM-DD
-            filing_url = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/{accession}/{primary_doc}"
-            return filing_url, filing_date
-    raise Exception(f"No recent 10-Q found for ticker {ticker}")
-
-def extract_filing_section(filing_url: str, item_code: str, return_type: str = "text") -> str:
+def extract_filing_section(filing_url: str, item_code: str, return_type: str = "text", timeout: float = None) -> str:
     params = {
         "url": filing_url,
         "item": item_code,
         "type": return_type,
         "token": SEC_API_KEY
     }
-    response = requests.get(EXTRACTOR_API, params=params)
+    response = sec_get(EXTRACTOR_API, params=params, timeout=timeout)
     if response.status_code != 200:
         raise Exception(f"Failed to extract section {item_code}. Status: {response.status_code}")
     
@@ -113,37 +106,83 @@ def extract_filing_section(filing_url: str, item_code: str, return_type: str = "
         print(f"[DEBUG] Error processing response for {item_code}: {e}")
         return f"Error: Failed to process section {item_code} - {str(e)}"
 
-def fetch_all_important_sections(ticker: str, filing_url: str) -> dict:
-    sections = {}
-    for item_code in IMPORTANT_10Q_ITEMS:
-        try:
-            content = extract_filing_section(filing_url, item_code)
-            # Ensure content is a string and handle any remaining issues
-            if not isinstance(content, str):
-                content = str(content)
-            sections[item_code] = content
-        except Exception as e:
-            print(f"[DEBUG] Error fetching section {item_code} for {ticker}: {e}")
-            sections[item_code] = f"Error: {str(e)}"
+def _fetch_section(ticker: str, filing_url: str, item_code: str, timeout: float) -> str:
+    try:
+        content = extract_filing_section(filing_url, item_code, timeout=timeout)
+        # Ensure content is a string and handle any remaining issues
+        if not isinstance(content, str):
+            content = str(content)
+        return content
+    except Exception as e:
+        print(f"[DEBUG] Error fetching section {item_code} for {ticker}: {e}")
+        return f"Error: {str(e)}"
+
+def fetch_all_important_sections(ticker: str, filing_url: str, concurrency: int = None, timeout: float = None,
+                                 items: list = None) -> dict:
+    """
+    Extracts `items` (default IMPORTANT_10Q_ITEMS) concurrently, at most `concurrency` requests in flight.
+    A section that fails or exceeds `timeout` comes back as an "Error: ..." string, same as before,
+    so callers still get every other section.
+    """
+    items = items or IMPORTANT_10Q_ITEMS
+    concurrency = max(1, min(concurrency or SECTION_FETCH_CONCURRENCY, len(items)))
+    timeout = timeout or SECTION_FETCH_TIMEOUT
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"sections-{ticker}")
+    try:
+        futures = {
+            item_code: executor.submit(_fetch_section, ticker, filing_url, item_code, timeout)
+            for item_code in items
+        }
+        # Queued sections only start once a worker frees up, so allow one timeout per "wave"
+        waves = math.ceil(len(items) / concurrency)
+        wait(futures.values(), timeout=timeout * waves)
+
+        sections = {}
+        for item_code, future in futures.items():
+            if future.done():
+                sections[item_code] = future.result()
+            else:
+                print(f"[DEBUG] Timed out fetching section {item_code} for {ticker}")
+                sections[item_code] = f"Error: Timed out extracting section {item_code} after {timeout}s"
+    finally:
+        # Don't hold the caller hostage to a hung request; stragglers finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
     return {
         "ticker": ticker.upper(),
         "filing_url": filing_url,
         "sections": sections
     }
 
-def summarize_extracted_10q_sections(ticker: str, debug: bool = False) -> dict:
-    filing_url = get_latest_10q_filing_url(ticker)
-    result = fetch_all_important_sections(ticker, filing_url)
-
-    combined_text = "\n\n".join([
-        f"## Section: {code}\n{content}"
-        for code, content in result["sections"].items()
+def build_filing_text(sections: dict) -> str:
+    """
+    The text handed to summarize_transcript: every section that was extracted successfully, under a
+    "## Section:" header, pre-ranked down to its token budget when EXTRACTIVE_PRERANK is on.
+    """
+    usable = {
+        code: content for code, content in sections.items()
         if isinstance(content, str) and not content.startswith("Error:")
-    ])
+    }
+    if EXTRACTIVE_PRERANK:
+        usable = prerank_sections(usable)
 
+    combined_text = "\n\n".join([f"## Section: {code}\n{content}" for code, content in usable.items()])
     if not combined_text.strip():
         combined_text = "No valid sections found for analysis."
+    return combined_text
+
+def summarize_extracted_10q_sections(ticker: str, debug: bool = False) -> dict:
+    filing_url = get_latest_10q_filing_url(ticker)
+    # Simultaneous requests for the same filing share one fetch + summarize run
+    return singleflight.do(
+        ("summary-by-ticker", ticker.upper(), filing_url, debug),
+        _summarize_filing, ticker, filing_url, debug
+    )
 
+def _summarize_filing(ticker: str, filing_url: str, debug: bool) -> dict:
+    result = fetch_all_important_sections(ticker, filing_url)
+    combined_text = build_filing_text(result["sections"])
     summary = summarize_transcript(combined_text, ticker)
 
     if debug:
@@ -160,102 +199,253 @@ def summarize_extracted_10q_sections(ticker: str, debug: bool = False) -> dict:
         "summary": summary
     }
 
-def get_summary_from_db(ticker: str, filing_date: date):
+# The DB helpers below take an optional session so a request can run get/claim/update on one
+# pooled connection; without one they open and close their own, as before.
+
+def get_summary_from_db(ticker: str, filing_date: date, db: Session = None):
+    ticker = ticker.strip().upper()
     print(f"[DEBUG] Checking DB for summary: ticker={ticker}, filing_date={filing_date}")
-    db = SessionLocal()
-    try:
-        summary = db.query(Summary).filter_by(ticker=ticker, filing_date=filing_date).first()
-        if summary:
-            print(f"[DEBUG] Found summary in DB: {summary.summary_text[:50]}...")
-        else:
-            print(f"[DEBUG] No summary found in DB")
-        return summary
-    except Exception as e:
-        print(f"[DEBUG] Error querying DB: {e}")
+    with session_scope(db) as db:
+        try:
+            summary = db.query(Summary).filter_by(ticker=ticker, filing_date=filing_date).first()
+            if summary:
+                print(f"[DEBUG] Found summary in DB: {summary.summary_text[:50]}...")
+            else:
+                print(f"[DEBUG] No summary found in DB")
+            return summary
+        except Exception as e:
+            print(f"[DEBUG] Error querying DB: {e}")
+            db.rollback()
+            return None
+
+def get_latest_summaries(tickers, db: Session = None) -> dict:
+    """
+    The newest summary row for each ticker, in one query: a ticker IN (...) subquery picks each
+    ticker's latest filing_date and the join pulls those rows. Tickers without a summary are absent.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    if not tickers:
+        return {}
+    with session_scope(db) as db:
+        latest = db.query(
+            Summary.ticker, func.max(Summary.filing_date).label("filing_date")
+        ).filter(Summary.ticker.in_(tickers)).group_by(Summary.ticker).subquery()
+        rows = db.query(Summary).join(
+            latest,
+            (Summary.ticker == latest.c.ticker) & (Summary.filing_date == latest.c.filing_date)
+        ).all()
+    return {row.ticker: row for row in rows}
+
+def summary_status(summary_text: str) -> str:
+    if summary_text is None:
+        return "missing"
+    if summary_text == "generating...":
+        return "generating"
+    if summary_text.startswith("Error generating summary"):
+        return "failed"
+    return "ready"
+
+def _is_final_summary(summary_text: str) -> bool:
+    return summary_text != "generating..." and not summary_text.startswith("Error generating summary")
+
+def get_summary_text(ticker: str, filing_date: date, db: Session = None):
+    """
+    The stored summary text for (ticker, filing_date), or None if there's no row. Finished summaries
+    come from the cache; placeholders and errors are always read from the DB since they change.
+    """
+    ticker = ticker.strip().upper()
+    cache_key = f"{ticker}:{filing_date.isoformat()}"
+    cached = _summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    summary = get_summary_from_db(ticker, filing_date, db=db)
+    if summary is None:
         return None
-    finally:
-        db.close()
+    if _is_final_summary(summary.summary_text):
+        _summary_cache.set(cache_key, summary.summary_text)
+    return summary.summary_text
 
-def create_summary_placeholder(ticker: str, filing_date: date):
-    print(f"[DEBUG] Creating placeholder for: ticker={ticker}, filing_date={filing_date}")
-    db = SessionLocal()
-    try:
-        placeholder = Summary(
-            ticker=ticker,
-            filing_date=filing_date,
-            summary_text="generating...",
-            created_at=datetime.utcnow()
-        )
-        db.add(placeholder)
+def claim_summary_generation(ticker: str, filing_date: date, db: Session = None) -> bool:
+    """
+    Atomically inserts the "generating..." placeholder. Returns True only for the one caller (across
+    all requests and workers) whose insert landed, i.e. the caller that should run the generation.
+    Tickers are stored upper-cased, whatever case the caller was given.
+    """
+    ticker = ticker.strip().upper()
+    values = dict(ticker=ticker, filing_date=filing_date, summary_text="generating...", created_at=datetime.utcnow())
+    with session_scope(db) as db:
+        try:
+            insert = get_dialect_insert()
+            if insert is not None:
+                stmt = insert(Summary).values(**values).on_conflict_do_nothing(index_elements=["ticker", "filing_date"])
+                claimed = db.execute(stmt).rowcount == 1
+            else:
+                db.add(Summary(**values))
+                db.flush()
+                claimed = True
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            claimed = False
+        except Exception as e:
+            print(f"[DEBUG] Error claiming summary generation: {e}")
+            db.rollback()
+            claimed = False
+    print(f"[DEBUG] Claim for ticker={ticker}, filing_date={filing_date}: {'won' if claimed else 'already taken'}")
+    return claimed
+
+def reclaim_failed_summary(ticker: str, filing_date: date, db: Session = None) -> bool:
+    """
+    Resets an error row to "generating..." for a retry. Like claim_summary_generation the UPDATE is
+    conditional on the row still holding an error, so of several callers retrying the same failure
+    only the one whose update lands (True) should run the generation.
+    """
+    ticker = ticker.strip().upper()
+    with session_scope(db) as db:
+        reclaimed = db.query(Summary).filter(
+            Summary.ticker == ticker,
+            Summary.filing_date == filing_date,
+            Summary.summary_text.like("Error generating summary%")
+        ).update({"summary_text": "generating..."}, synchronize_session=False) == 1
         db.commit()
-        print(f"[DEBUG] Placeholder created successfully")
-    except Exception as e:
-        print(f"[DEBUG] Error creating placeholder: {e}")
-        db.rollback()
-    finally:
-        db.close()
+    if reclaimed:
+        _summary_cache.delete(f"{ticker}:{filing_date.isoformat()}")
+    print(f"[DEBUG] Reclaim of failed summary ticker={ticker}, filing_date={filing_date}: {'won' if reclaimed else 'already taken'}")
+    return reclaimed
+
+def _summary_rank(summary_text: str) -> int:
+    return {"ready": 2, "generating": 1}.get(summary_status(summary_text), 0)
 
-def update_summary_in_db(ticker: str, filing_date: date, summary_text: str):
+def normalize_summary_tickers(db: Session = None) -> int:
+    """
+    Upper-cases the tickers of summary rows and summary jobs written under another case by older code
+    (/stock/{ticker} used to store the raw path ticker), so exact-match lookups find them. Where both
+    spellings exist for one filing, the more useful summary row (ready, then generating, then failed)
+    and the upper-case job are kept. Returns the number of legacy rows fixed.
+    """
+    fixed = 0
+    with session_scope(db) as db:
+        for row in db.query(Summary).filter(Summary.ticker != func.upper(Summary.ticker)).all():
+            twin = db.query(Summary).filter_by(ticker=row.ticker.upper(), filing_date=row.filing_date).first()
+            if twin is not None:
+                if _summary_rank(twin.summary_text) >= _summary_rank(row.summary_text):
+                    db.delete(row)
+                    fixed += 1
+                    continue
+                db.delete(twin)
+                db.flush()
+            row.ticker = row.ticker.upper()
+            fixed += 1
+        for job in db.query(SummaryJob).filter(SummaryJob.ticker != func.upper(SummaryJob.ticker)).all():
+            if db.query(SummaryJob.id).filter_by(ticker=job.ticker.upper(), filing_date=job.filing_date).first():
+                db.delete(job)
+            else:
+                job.ticker = job.ticker.upper()
+            fixed += 1
+        db.commit()
+    if fixed:
+        print(f"[DEBUG] Upper-cased {fixed} legacy summary/job tickers")
+    return fixed
+
+def update_summary_in_db(ticker: str, filing_date: date, summary_text: str, db: Session = None):
+    ticker = ticker.strip().upper()
     print(f"[DEBUG] Updating summary in DB: ticker={ticker}, filing_date={filing_date}")
-    db = SessionLocal()
-    try:
-        summary_to_update = db.query(Summary).filter_by(ticker=ticker, filing_date=filing_date).first()
-        if summary_to_update:
-            summary_to_update.summary_text = summary_text
-            db.commit()
-            print(f"[DEBUG] Summary updated successfully")
-        else:
-            print(f"[DEBUG] No summary found to update")
-    except Exception as e:
-        print(f"[DEBUG] Error updating summary: {e}")
-        db.rollback()
-    finally:
-        db.close()
+    with session_scope(db) as db:
+        try:
+            summary_to_update = db.query(Summary).filter_by(ticker=ticker, filing_date=filing_date).first()
+            if summary_to_update:
+                summary_to_update.summary_text = summary_text
+                db.commit()
+                cache_key = f"{ticker}:{filing_date.isoformat()}"
+                if _is_final_summary(summary_text):
+                    _summary_cache.set(cache_key, summary_text)
+                else:
+                    _summary_cache.delete(cache_key)
+                publish_summary_event(ticker, filing_date)
+                print(f"[DEBUG] Summary updated successfully")
+            else:
+                print(f"[DEBUG] No summary found to update")
+        except Exception as e:
+            print(f"[DEBUG] Error updating summary: {e}")
+            db.rollback()
 
-def run_ai_summary_and_save(ticker: str, filing_date: date):
+def generate_and_save_summary(ticker: str, filing_date: date, filing_url: str = None, on_progress=None,
+                              allow_partial: bool = True):
     """
-    This function runs the slow AI summarization and updates the DB.
-    It's designed to be called as a background task.
+    Fetches the filing sections, summarizes them and stores the result. Errors propagate so the
+    caller (the job worker, or the backfill CLI) decides whether to retry or record them.
+    on_progress, if given, is called with a short stage description as the work moves along.
+
+    Work is kept per section in filing_sections, so a retry only extracts and summarizes the sections
+    an earlier attempt didn't finish, and a section whose content was already summarized for another
+    filing (boilerplate carried over from an earlier quarter) reuses that summary. A section the filing
+    doesn't have is left out; with allow_partial=False one that failed to extract (a transient error)
+    fails the run, after everything else has been stored.
     """
-    print(f"[BACKGROUND TASK STARTED] Starting AI summary for {ticker} ({filing_date})...")
-    try:
-        # Re-fetch filing_url as it's not passed to the background task
+    report = on_progress or (lambda stage: None)
+    if not filing_url:
+        # Callers normally hand over the URL they already resolved; only look it up if they didn't
         print(f"[BACKGROUND TASK] Getting filing info for {ticker}")
         filing_url, _ = get_latest_10q_filing_info(ticker)
-        print(f"[BACKGROUND TASK] Filing URL: {filing_url}")
-        
-        print(f"[BACKGROUND TASK] Fetching sections for {ticker}")
-        result = fetch_all_important_sections(ticker, filing_url)
-        sections = result["sections"]  # Extract the actual sections dict
-        
-        # Debug: Check what we're working with
-        print(f"[DEBUG] Sections for {ticker}: {list(sections.keys())}")
-        for code, content in sections.items():
-            print(f"[DEBUG] Section {code} type: {type(content)}, length: {len(str(content))}")
-            if not isinstance(content, str):
-                print(f"[DEBUG] Section {code} is not string: {content}")
-        
-        print(f"[BACKGROUND TASK] Processing sections for {ticker}")
-        combined_text = "\n\n".join([
-            f"## Section: {code}\n{content}"
-            for code, content in sections.items()
-            if isinstance(content, str) and not content.startswith("Error:")
-        ])
-        
-        if not combined_text.strip():
-            combined_text = "No valid sections found for analysis."
-            
-        print(f"[BACKGROUND TASK] Calling AI summarizer for {ticker}")
-        summary_text = summarize_transcript(combined_text, ticker)
-        print(f"[BACKGROUND TASK] AI summary generated for {ticker}")
-        
-        print(f"[BACKGROUND TASK] Saving to database for {ticker}")
-        update_summary_in_db(ticker, filing_date, summary_text)
-        print(f"[Background Task] Successfully generated and saved summary for {ticker}.")
-    except Exception as e:
-        print(f"[Background Task ERROR] Failed to generate summary for {ticker}: {e}")
-        import traceback
-        print(f"[Background Task ERROR] Full traceback: {traceback.format_exc()}")
-        error_message = f"Error generating summary: {str(e)}"
-        update_summary_in_db(ticker, filing_date, error_message)
+    print(f"[BACKGROUND TASK] Filing URL: {filing_url}")
+    accession = accession_from_url(filing_url)
+
+    stored = get_stored_sections(accession)
+    missing = [code for code in IMPORTANT_10Q_ITEMS if code not in stored]
+    print(f"[BACKGROUND TASK] {ticker} {accession}: {len(stored)} sections stored, fetching {missing}")
+    absent = []
+    if missing:
+        report("fetching sections")
+        fetched = fetch_all_important_sections(ticker, filing_url, items=missing)["sections"]
+        for code, content in fetched.items():
+            if not isinstance(content, str) or content.startswith("Error:"):
+                print(f"[DEBUG] Section {code} for {ticker} unavailable: {str(content)[:200]}")
+            elif not content.strip():
+                # The extractor answered with nothing: the filing has no such item, and a retry won't change that
+                print(f"[DEBUG] Section {code} not present in {ticker}'s filing")
+                absent.append(code)
+            else:
+                digest = store_section(accession, code, content)
+                stored[code] = {"content": content, "content_hash": digest, "summary_text": None}
+    failed = [code for code in IMPORTANT_10Q_ITEMS if code not in stored and code not in absent]
+
+    section_summaries, pending = {}, {}
+    for code in IMPORTANT_10Q_ITEMS:
+        if code not in stored:
+            continue
+        section = stored[code]
+        summary = section["summary_text"] or find_summary_by_hash(code, section["content_hash"], SECTION_SUMMARY_VERSION)
+        if summary is None:
+            pending[code] = build_filing_text({code: section["content"]})
+            continue
+        if section["summary_text"] is None:
+            store_section_summary(accession, code, section["content_hash"], summary, SECTION_SUMMARY_VERSION)
+        section_summaries[code] = summary
+
+    if pending:
+        print(f"[BACKGROUND TASK] Summarizing sections {list(pending)} for {ticker}")
+        summaries, errors = summarize_sections(pending, ticker, on_progress=report)
+        for code, summary in summaries.items():
+            store_section_summary(accession, code, stored[code]["content_hash"], summary, SECTION_SUMMARY_VERSION)
+            section_summaries[code] = summary
+        if errors:
+            code, error = next(iter(errors.items()))
+            raise Exception(f"Summarizing section {code} failed: {error}") from error
+
+    if failed and not allow_partial:
+        raise Exception(f"Could not extract sections: {', '.join(failed)}")
+    if not section_summaries:
+        raise Exception(f"Could not extract sections: {', '.join(failed + absent)}")
+
+    print(f"[BACKGROUND TASK] Combining {len(section_summaries)} section summaries for {ticker}")
+    report("combining summaries")
+    summary_text = combine_summaries([section_summaries[code] for code in IMPORTANT_10Q_ITEMS if code in section_summaries])
+    print(f"[BACKGROUND TASK] AI summary generated for {ticker}")
+
+    print(f"[BACKGROUND TASK] Saving to database for {ticker}")
+    update_summary_in_db(ticker, filing_date, summary_text)
+    print(f"[Background Task] Successfully generated and saved summary for {ticker}.")
 
+def record_summary_failure(ticker: str, filing_date: date, error: Exception):
+    error_message = f"Error generating summary: {str(error)}"
+    update_summary_in_db(ticker, filing_date, error_message)
@@ -0,0 +1,255 @@
+import os
+import random
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import Summary, SummaryJob
+from app.database import SessionLocal, engine, get_dialect_insert, session_scope
+from app.services.summary_events import publish_summary_event
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "900"))
+# A running job whose lock is older than this is assumed to belong to a dead worker
+JOB_STALE_AFTER_SECONDS = int(os.getenv("JOB_STALE_AFTER_SECONDS", "1800"))
+
+def enqueue_summary_job(ticker: str, filing_date: date, filing_url: str = None, db: Session = None) -> bool:
+    """
+    Queues a summary job for (ticker, filing_date). Idempotent: an already queued/running job is left
+    alone, while a finished or failed one is re-armed. Returns True if a job was (re)queued.
+    """
+    ticker = ticker.strip().upper()
+    now = datetime.utcnow()
+    values = dict(
+        ticker=ticker, filing_date=filing_date, filing_url=filing_url, status="queued",
+        attempts=0, max_attempts=JOB_MAX_ATTEMPTS, run_after=now, created_at=now
+    )
+    with session_scope(db) as db:
+        try:
+            insert = get_dialect_insert()
+            if insert is not None:
+                stmt = insert(SummaryJob).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["ticker", "filing_date"],
+                    set_=dict(
+                        filing_url=stmt.excluded.filing_url, status="queued", attempts=0,
+                        run_after=now, last_error=None, locked_by=None, locked_at=None,
+                        started_at=None, finished_at=None, progress=None
+                    ),
+                    where=SummaryJob.status.in_(["done", "failed"])
+                )
+                queued = db.execute(stmt).rowcount == 1
+            else:
+                db.add(SummaryJob(**values))
+                db.flush()
+                queued = True
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            queued = False
+    if queued:
+        publish_summary_event(ticker, filing_date)
+    print(f"[DEBUG] Enqueue summary job ticker={ticker}, filing_date={filing_date}: {'queued' if queued else 'already active'}")
+    return queued
+
+def claim_next_job(worker_id: str):
+    """
+    Takes the oldest runnable job and marks it running. On Postgres, FOR UPDATE SKIP LOCKED lets many
+    workers poll at once without contending; on SQLite the conditional UPDATE below is what keeps two
+    workers from taking the same job.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        query = db.query(SummaryJob).filter(
+            SummaryJob.status == "queued",
+            SummaryJob.run_after <= now
+        ).order_by(SummaryJob.run_after.asc())
+        if engine.dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+        job = query.first()
+        if job is None:
+            db.rollback()
+            return None
+
+        claimed = db.query(SummaryJob).filter(
+            SummaryJob.id == job.id,
+            SummaryJob.status == "queued"
+        ).update({
+            "status": "running",
+            "attempts": SummaryJob.attempts + 1,
+            "locked_by": worker_id,
+            "locked_at": now,
+            "started_at": now,
+            "progress": "starting",
+        }, synchronize_session=False)
+        db.commit()
+        if claimed != 1:
+            return None
+        db.refresh(job)
+        db.expunge(job)
+        publish_summary_event(job.ticker, job.filing_date)
+        return job
+    finally:
+        db.close()
+
+def complete_job(job_id: int):
+    db = SessionLocal()
+    try:
+        db.query(SummaryJob).filter(SummaryJob.id == job_id).update({
+            "status": "done",
+            "finished_at": datetime.utcnow(),
+            "locked_by": None,
+            "locked_at": None,
+            "last_error": None,
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def set_job_progress(job_id: int, progress: str):
+    # Best effort: a lost progress update must never fail the job itself
+    db = SessionLocal()
+    try:
+        db.query(SummaryJob).filter(SummaryJob.id == job_id).update({"progress": progress}, synchronize_session=False)
+        db.commit()
+        job = db.query(SummaryJob.ticker, SummaryJob.filing_date).filter(SummaryJob.id == job_id).first()
+        if job is not None:
+            publish_summary_event(job.ticker, job.filing_date)
+    except Exception as e:
+        print(f"[DEBUG] Could not record progress for job {job_id}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def get_summary_state(ticker: str, filing_date: date, db: Session = None) -> dict:
+    """
+    Where generation of (ticker, filing_date) stands, from the summary row and its job (if any):
+    {"status": queued|running|done|error|missing, "progress": ..., "summary": ..., "error": ...}.
+    """
+    ticker = ticker.strip().upper()
+    with session_scope(db) as db:
+        summary = db.query(Summary.summary_text).filter_by(ticker=ticker, filing_date=filing_date).first()
+        job = db.query(SummaryJob.status, SummaryJob.progress, SummaryJob.attempts, SummaryJob.last_error).filter_by(
+            ticker=ticker, filing_date=filing_date
+        ).first()
+        # Don't hold a connection between polls
+        db.rollback()
+
+    summary_text = summary.summary_text if summary else None
+    if summary_text and summary_text != "generating...":
+        if summary_text.startswith("Error generating summary"):
+            return {"status": "error", "progress": None, "summary": None, "error": summary_text}
+        return {"status": "done", "progress": None, "summary": summary_text, "error": None}
+    if job is None:
+        status = "queued" if summary_text else "missing"
+        return {"status": status, "progress": None, "summary": None, "error": None}
+    if job.status == "failed":
+        return {"status": "error", "progress": None, "summary": None, "error": job.last_error}
+    state = {"status": job.status, "progress": job.progress, "summary": None, "error": None}
+    if job.status == "queued" and job.attempts:
+        # Waiting out a retry backoff
+        state["progress"] = f"retrying after attempt {job.attempts}"
+    elif job.status == "done":
+        # The job finished but the summary row hasn't been written yet; keep waiting
+        state["status"] = "running"
+    return state
+
+def retry_delay_seconds(attempts: int) -> float:
+    # Exponential backoff with full jitter so failed jobs don't all come back at once
+    return random.uniform(0, min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1)))
+
+def fail_job(job_id: int, error: str) -> bool:
+    """Records a failed attempt. Returns True if the job will be retried, False if it is out of attempts."""
+    db = SessionLocal()
+    try:
+        job = db.get(SummaryJob, job_id)
+        if job is None:
+            return False
+        now = datetime.utcnow()
+        job.last_error = error
+        job.locked_by = None
+        job.locked_at = None
+        will_retry = job.attempts < job.max_attempts
+        if will_retry:
+            job.status = "queued"
+            job.run_after = now + timedelta(seconds=retry_delay_seconds(job.attempts))
+        else:
+            job.status = "failed"
+            job.finished_at = now
+        db.commit()
+        publish_summary_event(job.ticker, job.filing_date)
+        return will_retry
+    finally:
+        db.close()
+
+def reap_stale_jobs() -> int:
+    """
+    Puts running jobs whose worker went away back in the queue, and queues jobs for summary rows left
+    at "generating..." with no job at all (e.g. by the old in-process background tasks). A stale job
+    that has used up its attempts is failed instead, so a job that keeps killing its worker (e.g. out
+    of memory on a huge filing) isn't requeued forever.
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=JOB_STALE_AFTER_SECONDS)
+    stale = (SummaryJob.status == "running") & (SummaryJob.locked_at < cutoff)
+    exhausted = stale & (SummaryJob.attempts >= SummaryJob.max_attempts)
+    error = "Reaped: worker stopped responding"
+    db = SessionLocal()
+    try:
+        dead = db.query(SummaryJob.ticker, SummaryJob.filing_date).filter(exhausted).all()
+        failed = db.query(SummaryJob).filter(exhausted).update({
+            "status": "failed",
+            "finished_at": now,
+            "locked_by": None,
+            "locked_at": None,
+            "last_error": f"{error} on its last attempt",
+        }, synchronize_session=False)
+        for ticker, filing_date in dead:
+            # Surface the failure on the summary row, as the worker does when a job runs out of retries
+            db.query(Summary).filter_by(
+                ticker=ticker, filing_date=filing_date, summary_text="generating..."
+            ).update({"summary_text": f"Error generating summary: {error}"}, synchronize_session=False)
+        retried = stale & (SummaryJob.attempts < SummaryJob.max_attempts)
+        revived = db.query(SummaryJob.ticker, SummaryJob.filing_date).filter(retried).all()
+        requeued = db.query(SummaryJob).filter(retried).update({
+            "status": "queued",
+            "run_after": now,
+            "locked_by": None,
+            "locked_at": None,
+            "last_error": error,
+        }, synchronize_session=False)
+        db.commit()
+
+        orphans = db.query(Summary.ticker, Summary.filing_date).outerjoin(
+            SummaryJob,
+            (SummaryJob.ticker == Summary.ticker) & (SummaryJob.filing_date == Summary.filing_date)
+        ).filter(
+            Summary.summary_text == "generating...",
+            Summary.created_at < cutoff,
+            SummaryJob.id.is_(None)
+        ).all()
+    finally:
+        db.close()
+
+    for ticker, filing_date in dead + revived:
+        publish_summary_event(ticker, filing_date)
+    for ticker, filing_date in orphans:
+        enqueue_summary_job(ticker, filing_date)
+    if requeued or failed or orphans:
+        print(f"[DEBUG] Reaper requeued {requeued} stale jobs, failed {failed} out of attempts "
+              f"and queued {len(orphans)} orphaned placeholders")
+    return requeued + failed + len(orphans)
+
+def get_job_stats() -> dict:
+    db = SessionLocal()
+    try:
+        counts = dict(db.query(SummaryJob.status, func.count(SummaryJob.id)).group_by(SummaryJob.status).all())
+        oldest_queued = db.query(func.min(SummaryJob.run_after)).filter(SummaryJob.status == "queued").scalar()
+    finally:
+        db.close()
+    return {
+        "by_status": counts,
+        "oldest_queued_age_seconds": (datetime.utcnow() - oldest_queued).total_seconds() if oldest_queued else None,
+    }
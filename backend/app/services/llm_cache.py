@@ -0,0 +1,122 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from app.models import LLMCacheEntry
+from app.database import SessionLocal
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+# Once cached responses add up to more than this, least recently used entries are evicted
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+EVICTION_BATCH_SIZE = 200
+# The table's total size is recomputed at least this often (in stores); in between a running estimate
+# is kept, so a store doesn't have to SUM the whole table
+LLM_CACHE_SIZE_CHECK_EVERY = int(os.getenv("LLM_CACHE_SIZE_CHECK_EVERY", "100"))
+# last_accessed_at only drives LRU eviction, so a hit rewrites it at most this often
+LLM_CACHE_TOUCH_INTERVAL_SECONDS = int(os.getenv("LLM_CACHE_TOUCH_INTERVAL_SECONDS", "3600"))
+
+_stats = {"hits": 0, "misses": 0, "evicted": 0, "errors": 0}
+# Bytes in the table as of the last size check plus what this process stored since (None until checked)
+_size_estimate = None
+_stores_since_check = 0
+_size_lock = threading.Lock()
+
+def make_cache_key(**request) -> str:
+    """
+    Content address of a chat completion: the prompt text already embeds the sanitized chunk and the
+    template, so hashing the whole request (model, messages, sampling params) covers all inputs.
+    """
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_cached_response(cache_key: str):
+    if not LLM_CACHE_ENABLED:
+        return None
+    db = SessionLocal()
+    try:
+        entry = db.get(LLMCacheEntry, cache_key)
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        now = datetime.utcnow()
+        if entry.last_accessed_at is None or now - entry.last_accessed_at > timedelta(seconds=LLM_CACHE_TOUCH_INTERVAL_SECONDS):
+            entry.last_accessed_at = now
+            db.commit()
+        _stats["hits"] += 1
+        return entry.response_text
+    except Exception as e:
+        print(f"[DEBUG] LLM cache lookup failed: {e}")
+        _stats["errors"] += 1
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
+def _evict_if_needed(db):
+    global _size_estimate, _stores_since_check
+    total = db.query(func.coalesce(func.sum(LLMCacheEntry.size_bytes), 0)).scalar()
+    # Evicting to a low-water mark leaves headroom, so the next stores don't each trigger a check
+    target = LLM_CACHE_MAX_BYTES * 0.9 if total > LLM_CACHE_MAX_BYTES else LLM_CACHE_MAX_BYTES
+    while total > target:
+        oldest = db.query(LLMCacheEntry.cache_key, LLMCacheEntry.size_bytes) \
+            .order_by(LLMCacheEntry.last_accessed_at.asc()) \
+            .limit(EVICTION_BATCH_SIZE).all()
+        if not oldest:
+            break
+        keys = []
+        for key, size in oldest:
+            keys.append(key)
+            total -= size or 0
+            if total <= target:
+                break
+        db.query(LLMCacheEntry).filter(LLMCacheEntry.cache_key.in_(keys)).delete(synchronize_session=False)
+        db.commit()
+        _stats["evicted"] += len(keys)
+    _size_estimate, _stores_since_check = total, 0
+
+def _note_stored(db, size_bytes: int):
+    global _size_estimate, _stores_since_check
+    with _size_lock:
+        must_check = (
+            _size_estimate is None
+            or _stores_since_check >= LLM_CACHE_SIZE_CHECK_EVERY
+            or _size_estimate + size_bytes > LLM_CACHE_MAX_BYTES
+        )
+        if not must_check:
+            _size_estimate += size_bytes
+            _stores_since_check += 1
+            return
+        _evict_if_needed(db)
+
+def store_response(cache_key: str, model: str, response_text: str):
+    if not LLM_CACHE_ENABLED:
+        return
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        size_bytes = len(response_text.encode("utf-8"))
+        db.add(LLMCacheEntry(
+            cache_key=cache_key,
+            model=model,
+            response_text=response_text,
+            size_bytes=size_bytes,
+            created_at=now,
+            last_accessed_at=now
+        ))
+        db.commit()
+        _note_stored(db, size_bytes)
+    except IntegrityError:
+        # Another worker cached the same request first; its answer is just as good
+        db.rollback()
+    except Exception as e:
+        print(f"[DEBUG] LLM cache store failed: {e}")
+        _stats["errors"] += 1
+        db.rollback()
+    finally:
+        db.close()
+
+def get_llm_cache_stats() -> dict:
+    return dict(_stats, enabled=LLM_CACHE_ENABLED, max_bytes=LLM_CACHE_MAX_BYTES)
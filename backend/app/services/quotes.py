@@ -0,0 +1,225 @@
+import os
+import math
+import threading
+import requests
+import yfinance as yf
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from typing import Callable, Dict, List
+from curl_cffi import CurlECode, requests as cffi_requests
+from app.services.cache import get_cache
+from app.services.circuit import get_breaker, CircuitOpenError
+
+MAX_SYMBOLS_PER_REQUEST = int(os.getenv("MAX_SYMBOLS_PER_REQUEST", "50"))
+# Used only when the batched download fails outright and we fall back to per-symbol lookups
+QUOTE_FANOUT_CONCURRENCY = int(os.getenv("QUOTE_FANOUT_CONCURRENCY", "8"))
+# Quotes move every second while the market is open and not at all after the close
+QUOTE_TTL_MARKET_SECONDS = float(os.getenv("QUOTE_TTL_MARKET_SECONDS", "5"))
+QUOTE_TTL_CLOSED_SECONDS = float(os.getenv("QUOTE_TTL_CLOSED_SECONDS", "300"))
+QUOTE_CACHE_MAX_ENTRIES = int(os.getenv("QUOTE_CACHE_MAX_ENTRIES", "5000"))
+# Per-request timeout for Yahoo; yfinance would otherwise wait up to 30s on .info
+YFINANCE_TIMEOUT_SECONDS = float(os.getenv("YFINANCE_TIMEOUT_SECONDS", "10"))
+
+MARKET_TZ = ZoneInfo("America/New_York")
+
+# "kind:symbol" -> value; shared across processes through Redis when REDIS_URL is set
+_cache = get_cache("quotes", QUOTE_CACHE_MAX_ENTRIES)
+# (kind, symbol) -> Future for fetches currently in progress
+_inflight = {}
+_lock = threading.Lock()
+# Every yfinance call goes through this; while it is open, lookups fail fast instead of waiting on Yahoo
+_breaker = get_breaker("yfinance")
+# curl errors that mean Yahoo couldn't be reached or didn't answer, as opposed to answering with an error
+_CURL_OUTAGE_CODES = frozenset({
+    CurlECode.COULDNT_RESOLVE_HOST, CurlECode.COULDNT_CONNECT, CurlECode.OPERATION_TIMEDOUT,
+    CurlECode.SSL_CONNECT_ERROR, CurlECode.GOT_NOTHING, CurlECode.SEND_ERROR, CurlECode.RECV_ERROR,
+})
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0, "upstream_symbols": 0, "upstream_errors": 0}
+
+class _BoundedSession(requests.Session):
+    # yfinance passes timeout=30 on every request, which would override a session-wide default
+    def request(self, method, url, **kwargs):
+        kwargs["timeout"] = YFINANCE_TIMEOUT_SECONDS
+        return super().request(method, url, **kwargs)
+
+class _BoundedCffiSession(cffi_requests.Session):
+    def request(self, method, url, **kwargs):
+        kwargs["timeout"] = YFINANCE_TIMEOUT_SECONDS
+        return super().request(method, url, **kwargs)
+
+def _is_outage(error: Exception) -> bool:
+    # Only connection errors, timeouts and 5xx count against the circuit; an unknown or delisted symbol
+    # (or a batch that came back with no data) means Yahoo answered
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)):
+        return True
+    if isinstance(error, cffi_requests.RequestsError) and error.code in _CURL_OUTAGE_CODES:
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+def _error_quote(message: str) -> dict:
+    return {"price": None, "change": None, "changePercent": None, "error": message}
+
+def _quote_from_closes(closes) -> dict:
+    closes = [float(c) for c in closes if c is not None and not math.isnan(c)]
+    if not closes:
+        return _error_quote("No price data")
+    price = closes[-1]
+    previous = closes[-2] if len(closes) > 1 else price
+    change = price - previous
+    return {
+        "price": price,
+        "change": change,
+        "changePercent": (change / previous * 100) if previous else 0,
+    }
+
+def _download_quotes(symbols: List[str]) -> Dict[str, dict]:
+    # One batched request for every symbol; the last two daily closes give price and day change
+    data = yf.download(
+        tickers=" ".join(symbols),
+        period="5d",
+        interval="1d",
+        group_by="ticker",
+        auto_adjust=False,
+        threads=True,
+        progress=False,
+        timeout=YFINANCE_TIMEOUT_SECONDS
+    )
+    if data is None or data.empty:
+        raise Exception("Batched quote download returned no data")
+
+    quotes = {}
+    multi = data.columns.nlevels > 1
+    for symbol in symbols:
+        try:
+            closes = data[symbol]["Close"] if multi else data["Close"]
+            quotes[symbol] = _quote_from_closes(closes.tolist())
+        except KeyError:
+            quotes[symbol] = _error_quote("Unknown symbol")
+    return quotes
+
+def _fast_info_quote(symbol: str) -> dict:
+    try:
+        fast_info = yf.Ticker(symbol, session=_BoundedSession()).fast_info
+        price = fast_info.get("last_price") or 0
+        previous = fast_info.get("previous_close") or 0
+        change = price - previous if previous else 0
+        return {
+            "price": price,
+            "change": change,
+            "changePercent": (change / previous * 100) if previous else 0,
+        }
+    except Exception as e:
+        return _error_quote(str(e))
+
+def get_bulk_quotes(symbols: List[str]) -> Dict[str, dict]:
+    """
+    Quotes for many symbols at once, cache first. A symbol that can't be priced gets an inline
+    {"error": ...} entry instead of failing the whole batch.
+    """
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    if not symbols:
+        return {}
+    return _get_many("quote", symbols, _fetch_bulk_quotes)
+
+def _market_is_open(now: datetime = None) -> bool:
+    now = now or datetime.now(MARKET_TZ)
+    if now.weekday() >= 5:
+        return False
+    minutes = now.hour * 60 + now.minute
+    return 9 * 60 + 30 <= minutes < 16 * 60
+
+def quote_ttl_seconds() -> float:
+    return QUOTE_TTL_MARKET_SECONDS if _market_is_open() else QUOTE_TTL_CLOSED_SECONDS
+
+def _get_many(kind: str, symbols: List[str], fetch_batch: Callable[[List[str]], Dict[str, dict]]) -> Dict[str, dict]:
+    """
+    Cache-first lookup. Symbols that are missing and not already being fetched are fetched together in
+    one fetch_batch call; symbols another request is already fetching are waited on instead of refetched.
+    """
+    results, to_fetch, waiting = {}, {}, {}
+    for symbol in symbols:
+        cached = _cache.get(f"{kind}:{symbol}")
+        if cached is not None:
+            _stats["hits"] += 1
+            results[symbol] = cached
+            continue
+        with _lock:
+            future = _inflight.get((kind, symbol))
+            if future is None:
+                future = Future()
+                _inflight[(kind, symbol)] = future
+                to_fetch[symbol] = future
+                _stats["misses"] += 1
+            else:
+                waiting[symbol] = future
+                _stats["coalesced"] += 1
+
+    if to_fetch:
+        _stats["upstream_calls"] += 1
+        _stats["upstream_symbols"] += len(to_fetch)
+        try:
+            fetched = fetch_batch(list(to_fetch))
+            ttl = quote_ttl_seconds()
+            for symbol, future in to_fetch.items():
+                value = fetched.get(symbol) or _error_quote("No data returned")
+                # Failed lookups aren't cached so the next request retries them
+                if "error" not in value:
+                    _cache.set(f"{kind}:{symbol}", value, ttl)
+                future.set_result(value)
+                results[symbol] = value
+        except Exception as e:
+            _stats["upstream_errors"] += 1
+            for future in to_fetch.values():
+                if not future.done():
+                    future.set_exception(e)
+            raise
+        finally:
+            with _lock:
+                for symbol in to_fetch:
+                    _inflight.pop((kind, symbol), None)
+
+    for symbol, future in waiting.items():
+        results[symbol] = future.result()
+    return results
+
+def _fetch_bulk_quotes(symbols: List[str]) -> Dict[str, dict]:
+    try:
+        return _breaker.call(_download_quotes, symbols, is_failure=_is_outage)
+    except CircuitOpenError as e:
+        # Degraded: inline errors aren't cached, so quotes come back on their own once Yahoo does
+        return {symbol: _error_quote(str(e)) for symbol in symbols}
+    except Exception as e:
+        print(f"[DEBUG] Batched quote download failed ({e}), falling back to per-symbol lookups")
+    with ThreadPoolExecutor(max_workers=min(QUOTE_FANOUT_CONCURRENCY, len(symbols))) as executor:
+        return dict(zip(symbols, executor.map(_fast_info_quote, symbols)))
+
+def _fetch_stock_info(ticker: str) -> dict:
+    return _breaker.call(_download_stock_info, ticker, is_failure=_is_outage)
+
+def _download_stock_info(ticker: str) -> dict:
+    # Try with curl_cffi first, fallback to regular requests if it fails
+    try:
+        session = _BoundedCffiSession()
+        session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'
+        session.impersonate = "chrome110"
+        return yf.Ticker(ticker, session=session).info
+    except Exception as e:
+        print(f"[DEBUG] curl_cffi failed for {ticker}, trying regular yfinance: {e}")
+        # Fallback to regular yfinance without curl_cffi, still bounded by the same timeout
+        return yf.Ticker(ticker, session=_BoundedSession()).info
+
+def get_stock_info(ticker: str) -> dict:
+    """yfinance Ticker.info for one symbol, served from the shared quote cache."""
+    ticker = ticker.strip().upper()
+    return _get_many("info", [ticker], lambda symbols: {symbols[0]: _fetch_stock_info(symbols[0])})[ticker]
+
+def get_quote_cache_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"] + _stats["coalesced"]
+    return {
+        **_stats,
+        "entries": len(_cache),
+        "hit_ratio": round(_stats["hits"] / lookups, 4) if lookups else None,
+        "market_open": _market_is_open(),
+    }
@@ -1,20 +1,36 @@
 import re
 
+# Smart quotes and en dash become plain ASCII. (Non-breaking spaces need no mapping: they count as
+# whitespace when runs are collapsed below.)
+_REPLACEMENTS = (("“", "\""), ("”", "\""), ("‘", "'"), ("’", "'"), ("–", "-"))
+# Control characters: ASCII 0-31 except tab and newline, plus DEL
+_CONTROL_CHARS = tuple(chr(c) for c in [*range(0x00, 0x09), *range(0x0B, 0x20), 0x7F])
+# A blank line (possibly holding other whitespace, e.g. "\r\n\r\n" or a form feed) between paragraphs
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+PARAGRAPH_SEPARATOR = "\n\n"
+
 def sanitize_transcript(text: str) -> str:
     """
     Cleans transcript text to avoid malformed JSON, unescaped characters, and weird formatting.
     """
-    # Replace smart quotes with plain ones
-    text = text.replace("“", "\"").replace("”", "\"")
-    text = text.replace("‘", "'").replace("’", "'")
-
-    # Replace curly dashes or non-breaking spaces
-    text = text.replace("–", "-").replace("\u00A0", " ")
-
-    # Remove control characters (ASCII 0-31 except newline)
-    text = re.sub(r"[\x00-\x08\x0B-\x1F\x7F]", "", text)
+    # Each replace is a fast C scan, and one that finds nothing returns the string itself (no copy).
+    # Pure-ASCII text (most filings) can't contain any of the smart characters at all.
+    if not text.isascii():
+        for old, new in _REPLACEMENTS:
+            text = text.replace(old, new)
+    for control in _CONTROL_CHARS:
+        if control in text:
+            text = text.replace(control, "")
 
-    # Normalize excessive whitespace
-    text = re.sub(r"\s+", " ", text).strip()
+    # Collapse whitespace runs to one space and trim the ends (same whitespace set as re's \s)
+    return " ".join(text.split())
 
-    return text
+def sanitize_paragraphs(text: str) -> str:
+    """
+    sanitize_transcript applied to each paragraph, with paragraphs kept apart by one blank line so
+    the chunker can split on them. Empty paragraphs are dropped.
+    """
+    if "\n" not in text:
+        return sanitize_transcript(text)
+    paragraphs = (sanitize_transcript(paragraph) for paragraph in PARAGRAPH_BREAK.split(text))
+    return PARAGRAPH_SEPARATOR.join(paragraph for paragraph in paragraphs if paragraph)
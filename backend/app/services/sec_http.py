@@ -0,0 +1,224 @@
+import os
+import time
+import random
+import threading
+import requests
+from bisect import bisect_left
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from app.services.cache import get_redis_client, REDIS_KEY_PREFIX
+from app.services.circuit import get_breaker
+
+# SEC fair access asks for a descriptive User-Agent (name + contact email) and at most 10 requests/s
+SEC_USER_AGENT = os.getenv("SEC_USER_AGENT", "YourAppName/1.0")
+SEC_RATE_LIMIT_PER_SECOND = float(os.getenv("SEC_RATE_LIMIT_PER_SECOND", "10"))
+# sec-api.io (the section extractor) is a separate service with its own plan limits
+SEC_API_RATE_LIMIT_PER_SECOND = float(os.getenv("SEC_API_RATE_LIMIT_PER_SECOND", "10"))
+SEC_HTTP_POOL_SIZE = int(os.getenv("SEC_HTTP_POOL_SIZE", "20"))
+SEC_HTTP_MAX_RETRIES = int(os.getenv("SEC_HTTP_MAX_RETRIES", "4"))
+SEC_HTTP_RETRY_BASE_SECONDS = float(os.getenv("SEC_HTTP_RETRY_BASE_SECONDS", "0.5"))
+SEC_HTTP_RETRY_MAX_SECONDS = float(os.getenv("SEC_HTTP_RETRY_MAX_SECONDS", "30"))
+SEC_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("SEC_HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+SEC_HTTP_TIMEOUT_SECONDS = float(os.getenv("SEC_HTTP_TIMEOUT_SECONDS", "30"))
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is everything slower
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Host -> limiter name; hosts sharing a name share a budget (www.sec.gov and data.sec.gov are one SEC)
+_LIMITER_FOR_HOST = {"www.sec.gov": "sec", "data.sec.gov": "sec", "api.sec-api.io": "sec-api"}
+
+class TokenBucket:
+    """
+    Token bucket of `rate` tokens/s holding up to `burst`, kept as the time the bucket will next be
+    empty (GCRA form). acquire() reserves a token and sleeps until it is due, so callers queue up in
+    arrival order instead of retrying.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float = None):
+        self.name = name
+        self.interval = 1 / rate
+        self.burst = burst or max(1.0, rate)
+        self._empty_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"acquired": 0, "waited": 0, "wait_seconds": 0.0}
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.time()
+            self._empty_at = max(self._empty_at, now) + self.interval
+            return self._empty_at - now - self.burst * self.interval
+
+    def acquire(self):
+        delay = self._reserve()
+        self.stats["acquired"] += 1
+        if delay > 0:
+            self.stats["waited"] += 1
+            self.stats["wait_seconds"] += delay
+            time.sleep(delay)
+
+    def get_stats(self) -> dict:
+        return {"backend": "local", "rate_per_second": 1 / self.interval, "burst": self.burst, **self.stats}
+
+class RedisTokenBucket(TokenBucket):
+    """
+    The same bucket with its state in Redis, so every API and worker process draws from one budget.
+    Redis time is used so hosts with skewed clocks still agree. Falls back to the process-local bucket
+    if Redis is unreachable.
+    """
+
+    def __init__(self, name: str, rate: float, client, burst: float = None):
+        super().__init__(name, rate, burst)
+        self._client = client
+        self._key = f"{REDIS_KEY_PREFIX}:ratelimit:{name}"
+        self.stats["redis_errors"] = 0
+
+    def _reserve(self) -> float:
+        def reserve(pipe):
+            seconds, micros = pipe.time()
+            now = seconds + micros / 1e6
+            empty_at = max(float(pipe.get(self._key) or 0), now) + self.interval
+            pipe.multi()
+            # Expires once the bucket would be full again, so idle limiters leave nothing behind
+            pipe.set(self._key, empty_at, px=int((empty_at - now) * 1000) + 1000)
+            return empty_at - now - self.burst * self.interval
+
+        try:
+            return self._client.transaction(reserve, self._key, value_from_callable=True)
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            print(f"[DEBUG] Redis rate limiter {self.name} unavailable, using the local bucket: {e}")
+            return super()._reserve()
+
+    def get_stats(self) -> dict:
+        return dict(super().get_stats(), backend="redis")
+
+def _make_bucket(name: str, rate: float) -> TokenBucket:
+    client = get_redis_client()
+    if client is not None:
+        return RedisTokenBucket(name, rate, client)
+    return TokenBucket(name, rate)
+
+_limiters = {
+    "sec": _make_bucket("sec", SEC_RATE_LIMIT_PER_SECOND),
+    "sec-api": _make_bucket("sec-api", SEC_API_RATE_LIMIT_PER_SECOND),
+}
+# One circuit per upstream, keyed like the limiters
+_breakers = {name: get_breaker(name) for name in _limiters}
+
+def _make_session() -> requests.Session:
+    # One keep-alive pool per host, shared by every thread; urllib3's pools are thread-safe
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(_LIMITER_FOR_HOST), pool_maxsize=SEC_HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = SEC_USER_AGENT
+    return session
+
+_session = _make_session()
+# host -> {"requests", "retries", "errors", "statuses", "latency_ms_buckets", "latency_ms_sum"}
+_host_stats = {}
+_stats_lock = threading.Lock()
+
+def _record(host: str, latency_ms: float = None, status: int = None, retried: bool = False, error: bool = False):
+    with _stats_lock:
+        stats = _host_stats.get(host)
+        if stats is None:
+            stats = _host_stats[host] = {
+                "requests": 0, "retries": 0, "errors": 0, "statuses": {},
+                "latency_ms_buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1), "latency_ms_sum": 0.0,
+            }
+        stats["requests"] += 1
+        stats["retries"] += retried
+        stats["errors"] += error
+        if status is not None:
+            stats["statuses"][str(status)] = stats["statuses"].get(str(status), 0) + 1
+        if latency_ms is not None:
+            stats["latency_ms_buckets"][bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+            stats["latency_ms_sum"] += latency_ms
+
+def _retry_after_seconds(response: requests.Response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+def _backoff_seconds(attempt: int, response: requests.Response = None) -> float:
+    # Full jitter so concurrent callers throttled together don't come back together
+    delay = random.uniform(0, min(SEC_HTTP_RETRY_MAX_SECONDS, SEC_HTTP_RETRY_BASE_SECONDS * 2 ** attempt))
+    retry_after = _retry_after_seconds(response) if response is not None else None
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, SEC_HTTP_RETRY_MAX_SECONDS))
+    return delay
+
+def sec_get(url: str, params: dict = None, headers: dict = None, timeout: float = None) -> requests.Response:
+    """
+    GET through the shared SEC session: paced by the host's token bucket, retried with jittered
+    backoff on connection errors and 429/5xx (honoring Retry-After). Returns the last response, so
+    callers keep checking status codes themselves; raises if the last attempt couldn't connect, or
+    CircuitOpenError without trying at all while the host's circuit is open.
+    """
+    host = urlsplit(url).hostname
+    limiter = _limiters.get(_LIMITER_FOR_HOST.get(host))
+    breaker = _breakers.get(_LIMITER_FOR_HOST.get(host))
+    # A dead host fails within the connect timeout; only a slow answer gets the full read timeout
+    timeout = (SEC_HTTP_CONNECT_TIMEOUT_SECONDS, timeout or SEC_HTTP_TIMEOUT_SECONDS)
+    for attempt in range(SEC_HTTP_MAX_RETRIES + 1):
+        # Checked on every attempt, so retry loops stop as soon as the circuit opens
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            if limiter is not None:
+                limiter.acquire()
+            started = time.perf_counter()
+            response = _session.get(url, params=params, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            _record(host, error=True, retried=attempt > 0)
+            if breaker is not None:
+                breaker.record_failure()
+            if attempt == SEC_HTTP_MAX_RETRIES:
+                raise
+            delay = _backoff_seconds(attempt)
+            print(f"[DEBUG] {host} request failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        except BaseException:
+            # Failed before the host could answer (e.g. the limiter's Redis is down): no verdict either way
+            if breaker is not None:
+                breaker.release_probe()
+            raise
+
+        _record(host, (time.perf_counter() - started) * 1000, response.status_code, retried=attempt > 0)
+        if breaker is not None:
+            if response.status_code == 429:
+                # Throttled, not down: retried below, but it says nothing about the host's health
+                breaker.release_probe()
+            elif response.status_code in RETRY_STATUSES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        if response.status_code not in RETRY_STATUSES or attempt == SEC_HTTP_MAX_RETRIES:
+            return response
+        delay = _backoff_seconds(attempt, response)
+        print(f"[DEBUG] {host} returned {response.status_code}, retrying in {delay:.1f}s")
+        response.close()
+        time.sleep(delay)
+
+def get_sec_http_stats() -> dict:
+    with _stats_lock:
+        hosts = {
+            host: dict(
+                stats,
+                statuses=dict(stats["statuses"]),
+                latency_ms_buckets=dict(zip([str(b) for b in LATENCY_BUCKETS_MS] + ["+Inf"], stats["latency_ms_buckets"])),
+            )
+            for host, stats in _host_stats.items()
+        }
+    return {"hosts": hosts, "limiters": {name: bucket.get_stats() for name, bucket in _limiters.items()}}
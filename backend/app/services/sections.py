@@ -0,0 +1,76 @@
+import re
+import hashlib
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.models import FilingSection
+from app.database import get_dialect_insert, session_scope
+
+# EDGAR archive URLs carry the accession number without dashes: /Archives/edgar/data/{cik}/{accession}/...
+_ACCESSION_IN_URL = re.compile(r"/Archives/edgar/data/\d+/(\d{10})(\d{2})(\d{6})/")
+
+def accession_from_url(filing_url: str) -> str:
+    """The filing's accession number (0000320193-24-000069 style), or a hash of the URL if it has none."""
+    match = _ACCESSION_IN_URL.search(filing_url)
+    if match:
+        return "-".join(match.groups())
+    return "url-" + hashlib.sha256(filing_url.encode("utf-8")).hexdigest()[:20]
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def get_stored_sections(accession: str, db: Session = None) -> dict:
+    """item_code -> {"content", "content_hash", "summary_text"} for every section stored for the filing."""
+    with session_scope(db) as db:
+        rows = db.query(
+            FilingSection.item_code, FilingSection.content, FilingSection.content_hash, FilingSection.summary_text
+        ).filter(FilingSection.accession == accession).all()
+    return {
+        row.item_code: {"content": row.content, "content_hash": row.content_hash, "summary_text": row.summary_text}
+        for row in rows
+    }
+
+def store_section(accession: str, item_code: str, content: str, db: Session = None) -> str:
+    """
+    Saves an extracted section and returns its content hash. If the stored content for (accession,
+    item_code) changed, its summary is cleared so it gets redone.
+    """
+    digest = content_hash(content)
+    with session_scope(db) as db:
+        row = db.query(FilingSection).filter_by(accession=accession, item_code=item_code).first()
+        if row is None:
+            values = dict(accession=accession, item_code=item_code, content_hash=digest, content=content)
+            insert = get_dialect_insert()
+            if insert is not None:
+                db.execute(insert(FilingSection).values(**values).on_conflict_do_nothing())
+            else:
+                db.add(FilingSection(**values))
+        elif row.content_hash != digest:
+            row.content, row.content_hash = content, digest
+            row.summary_text, row.summary_version, row.summarized_at = None, None, None
+        db.commit()
+    return digest
+
+def find_summary_by_hash(item_code: str, digest: str, version: str, db: Session = None):
+    """
+    A summary already made for identical content of the same section in any filing (e.g. unchanged
+    boilerplate), under the same summary version: a different prompt would not have produced it.
+    """
+    with session_scope(db) as db:
+        row = db.query(FilingSection.summary_text).filter(
+            FilingSection.item_code == item_code,
+            FilingSection.content_hash == digest,
+            FilingSection.summary_version == version,
+            FilingSection.summary_text.isnot(None)
+        ).first()
+    return row.summary_text if row else None
+
+def store_section_summary(accession: str, item_code: str, digest: str, summary_text: str, version: str,
+                          db: Session = None):
+    # Matching on the hash too means a summary of content that has since changed is never stored
+    with session_scope(db) as db:
+        db.query(FilingSection).filter_by(
+            accession=accession, item_code=item_code, content_hash=digest
+        ).update({
+            "summary_text": summary_text, "summary_version": version, "summarized_at": datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
@@ -0,0 +1,34 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable
+
+# key -> Future of the call currently running for that key in this process
+_inflight = {}
+_lock = threading.Lock()
+
+def do(key: Hashable, fn: Callable, *args, **kwargs):
+    """
+    Runs fn(*args, **kwargs) at most once at a time per key. Callers that arrive while it is running
+    don't start their own call; they block on the leader's Future and get the same result or exception.
+    """
+    with _lock:
+        future = _inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not is_leader:
+        print(f"[DEBUG] Attaching to in-flight call for {key}")
+        return future.result()
+
+    try:
+        result = fn(*args, **kwargs)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
@@ -0,0 +1,104 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.services.cache import get_cache
+from app.services.quotes import get_stock_info
+from app.services.fetcher import get_latest_10q_filing_info
+
+# Stale-while-revalidate for /stock/{ticker}: a snapshot younger than FRESH is served as is, one up to
+# MAX_STALE old is served at once while a background refresh replaces it, and anything older (or
+# missing) is fetched before responding. If that fetch fails (e.g. an upstream's circuit is open),
+# a snapshot up to DEGRADED old is still served rather than an error.
+STOCK_SNAPSHOT_SWR = os.getenv("STOCK_SNAPSHOT_SWR", "true").lower() == "true"
+STOCK_SNAPSHOT_FRESH_SECONDS = float(os.getenv("STOCK_SNAPSHOT_FRESH_SECONDS", "30"))
+STOCK_SNAPSHOT_MAX_STALE_SECONDS = float(os.getenv("STOCK_SNAPSHOT_MAX_STALE_SECONDS", "3600"))
+STOCK_SNAPSHOT_DEGRADED_SECONDS = float(os.getenv("STOCK_SNAPSHOT_DEGRADED_SECONDS", "86400"))
+STOCK_SNAPSHOT_MAX_ENTRIES = int(os.getenv("STOCK_SNAPSHOT_MAX_ENTRIES", "5000"))
+STOCK_SNAPSHOT_REFRESH_WORKERS = int(os.getenv("STOCK_SNAPSHOT_REFRESH_WORKERS", "4"))
+
+# ticker -> {"quote": {...}, "filing_url", "filing_date", "fetched_at"}; shared through Redis when configured
+_cache = get_cache("stock_snapshots", STOCK_SNAPSHOT_MAX_ENTRIES)
+_refresh_pool = ThreadPoolExecutor(max_workers=STOCK_SNAPSHOT_REFRESH_WORKERS, thread_name_prefix="snapshot-refresh")
+# Tickers with a background refresh queued or running in this process
+_refreshing = set()
+_lock = threading.Lock()
+_stats = {"fresh": 0, "stale": 0, "degraded": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+def _quote_fields(info: dict) -> dict:
+    return {
+        "price": info.get("currentPrice", info.get("regularMarketPrice")),
+        "change": info.get("regularMarketChange", 0),
+        "changePercent": info.get("regularMarketChangePercent", 0),
+        "marketCap": info.get("marketCap", 0),
+        "peRatio": info.get("trailingPE", 0),
+        "eps": info.get("trailingEps", 0),
+        "volume": info.get("regularMarketVolume", 0),
+    }
+
+def _fetch_snapshot(ticker: str) -> dict:
+    snapshot = {
+        "quote": _quote_fields(get_stock_info(ticker)),
+        "filing_url": None,
+        "filing_date": None,
+        "fetched_at": time.time(),
+    }
+    try:
+        snapshot["filing_url"], snapshot["filing_date"] = get_latest_10q_filing_info(ticker)
+    except Exception as e:
+        # The quote is still worth returning; the snapshot just isn't kept so the filing is retried
+        print(f"[DEBUG] Filing lookup failed for {ticker} snapshot: {e}")
+        return snapshot
+    _cache.set(ticker, snapshot, max(STOCK_SNAPSHOT_MAX_STALE_SECONDS, STOCK_SNAPSHOT_DEGRADED_SECONDS))
+    return snapshot
+
+def _refresh(ticker: str):
+    try:
+        _fetch_snapshot(ticker)
+        _stats["refreshes"] += 1
+    except Exception as e:
+        _stats["refresh_errors"] += 1
+        print(f"[DEBUG] Background snapshot refresh failed for {ticker}: {e}")
+    finally:
+        with _lock:
+            _refreshing.discard(ticker)
+
+def _schedule_refresh(ticker: str):
+    with _lock:
+        if ticker in _refreshing:
+            return
+        _refreshing.add(ticker)
+    _refresh_pool.submit(_refresh, ticker)
+
+def get_stock_snapshot(ticker: str) -> dict:
+    """
+    Quote and latest 10-Q metadata for ticker, plus "age_seconds" and "freshness" (fresh, stale, live
+    or degraded). Only a missing or too-old snapshot waits on yfinance and the SEC; a stale one is
+    returned immediately and refreshed in the background.
+    """
+    ticker = ticker.strip().upper()
+    snapshot = _cache.get(ticker) if STOCK_SNAPSHOT_SWR else None
+    if snapshot is not None:
+        age = max(0.0, time.time() - snapshot["fetched_at"])
+        if age < STOCK_SNAPSHOT_FRESH_SECONDS:
+            _stats["fresh"] += 1
+            return dict(snapshot, age_seconds=age, freshness="fresh")
+        if age < STOCK_SNAPSHOT_MAX_STALE_SECONDS:
+            _stats["stale"] += 1
+            _schedule_refresh(ticker)
+            return dict(snapshot, age_seconds=age, freshness="stale")
+
+    _stats["misses"] += 1
+    try:
+        return dict(_fetch_snapshot(ticker), age_seconds=0.0, freshness="live")
+    except Exception as e:
+        if snapshot is None:
+            raise
+        _stats["degraded"] += 1
+        print(f"[DEBUG] Snapshot fetch failed for {ticker}, serving last known data: {e}")
+        return dict(snapshot, age_seconds=age, freshness="degraded")
+
+def get_snapshot_stats() -> dict:
+    with _lock:
+        refreshing = len(_refreshing)
+    return {**_stats, "refreshing": refreshing, "enabled": STOCK_SNAPSHOT_SWR}
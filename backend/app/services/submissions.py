@@ -0,0 +1,114 @@
+import os
+import time
+from typing import List, Optional
+from app.services.cache import get_cache
+from app.services.sec_http import sec_get
+
+EDGAR_SUBMISSIONS_URL = "https://data.sec.gov/submissions/CIK{cik}.json"
+FILING_URL = "https://www.sec.gov/Archives/edgar/data/{cik}/{accession}/{primary_doc}"
+
+# Within this window a cached filing index is served without touching the SEC at all;
+# after it, the entry is revalidated with a conditional GET.
+SUBMISSIONS_CACHE_TTL_SECONDS = int(os.getenv("SUBMISSIONS_CACHE_TTL_SECONDS", "900"))
+SUBMISSIONS_CACHE_MAX_ENTRIES = int(os.getenv("SUBMISSIONS_CACHE_MAX_ENTRIES", "2000"))
+
+# cik -> {"filings": [...], "fetched_at": float, "etag": str, "last_modified": str}. Entries outlive the
+# TTL on purpose (their validators make revalidation cheap); with REDIS_URL they're shared across processes.
+_cache = get_cache("submissions", SUBMISSIONS_CACHE_MAX_ENTRIES)
+_stats = {"hits": 0, "misses": 0, "revalidated": 0, "errors": 0, "stale_served": 0}
+
+
+def _parse_filings(cik: str, data: dict) -> List[dict]:
+    recent = data.get("filings", {}).get("recent", {})
+    filings = []
+    for i, form in enumerate(recent.get("form", [])):
+        accession = recent["accessionNumber"][i]
+        primary_doc = recent["primaryDocument"][i]
+        filings.append({
+            "form": form,
+            "accession": accession,
+            "filing_date": recent["filingDate"][i],  # YYYY-MM-DD
+            "primary_doc": primary_doc,
+            "url": FILING_URL.format(cik=int(cik), accession=accession.replace("-", ""), primary_doc=primary_doc),
+        })
+    return filings
+
+
+def _store(cik: str, entry: dict):
+    _cache.set(cik, entry)
+
+
+def _serve_stale(cik: str, entry: dict, error) -> List[dict]:
+    # An outdated filing index beats failing every lookup while the SEC is down or throttling us
+    _stats["stale_served"] += 1
+    print(f"[DEBUG] Serving stale filings for CIK {cik} ({time.time() - entry['fetched_at']:.0f}s old): {error}")
+    return entry["filings"]
+
+
+def get_filings(cik: str) -> List[dict]:
+    """
+    Returns the parsed recent-filings index for a CIK, newest first, as EDGAR orders it.
+    """
+    cik = str(cik).zfill(10)
+    entry = _cache.get(cik)
+
+    if entry is not None and time.time() - entry["fetched_at"] < SUBMISSIONS_CACHE_TTL_SECONDS:
+        _stats["hits"] += 1
+        return entry["filings"]
+
+    headers = {}
+    if entry is not None:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        # Paced, retried and circuit-broken by the shared SEC client
+        res = sec_get(EDGAR_SUBMISSIONS_URL.format(cik=cik), headers=headers)
+    except Exception as e:
+        _stats["errors"] += 1
+        if entry is not None:
+            return _serve_stale(cik, entry, e)
+        raise
+
+    if res.status_code == 304 and entry is not None:
+        _stats["revalidated"] += 1
+        _store(cik, dict(entry, fetched_at=time.time()))
+        return entry["filings"]
+
+    if res.status_code != 200:
+        _stats["errors"] += 1
+        if entry is not None:
+            return _serve_stale(cik, entry, f"status {res.status_code}")
+        raise Exception("Failed to fetch filings from SEC")
+
+    _stats["misses"] += 1
+    filings = _parse_filings(cik, res.json())
+    _store(cik, {
+        "filings": filings,
+        "fetched_at": time.time(),
+        "etag": res.headers.get("ETag"),
+        "last_modified": res.headers.get("Last-Modified"),
+    })
+    return filings
+
+
+def get_latest_filing(cik: str, form: str = "10-Q") -> Optional[dict]:
+    for filing in get_filings(cik):
+        if filing["form"] == form:
+            return filing
+    return None
+
+
+def invalidate(cik: str):
+    _cache.delete(str(cik).zfill(10))
+
+
+def get_submissions_cache_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"] + _stats["revalidated"]
+    return {
+        **_stats,
+        "entries": len(_cache),
+        "hit_ratio": round((_stats["hits"] + _stats["revalidated"]) / lookups, 4) if lookups else None,
+    }
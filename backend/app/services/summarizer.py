@@ -1,53 +1,295 @@
 import os
-from openai import OpenAI
-from app.services.sanitizer import sanitize_transcript  # ✅ new import
+import json
+import time
+import hashlib
+import threading
+import itertools
+import httpx
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator
+from openai import OpenAI, RateLimitError, APIConnectionError, InternalServerError
+from app.services.sanitizer import sanitize_paragraphs  # ✅ new import
+from app.services.llm_cache import make_cache_key, get_cached_response, store_response
+from app.services.chunker import iter_token_chunks, count_tokens, CHUNK_MAX_TOKENS
+from app.services.circuit import get_breaker
 
-def split_transcript_into_chunks(text: str, max_words: int = 2200) -> list:
-    words = text.split()
-    chunks = []
-    for i in range(0, len(words), max_words):
-        chunk = " ".join(words[i:i+max_words])
-        chunks.append(chunk)
-    return chunks
+# Max chunk/combine requests in flight per summarize_transcript call
+SUMMARY_MAX_IN_FLIGHT = int(os.getenv("SUMMARY_MAX_IN_FLIGHT", "4"))
+# Retries on 429s, on top of the client's own retry of transient errors
+SUMMARY_RATE_LIMIT_RETRIES = int(os.getenv("SUMMARY_RATE_LIMIT_RETRIES", "5"))
+# Partial summaries are combined in groups no bigger than this before the final combine
+COMBINE_MAX_TOKENS = int(os.getenv("COMBINE_MAX_TOKENS", "3000"))
+# Per-request timeout; the SDK default is 10 minutes
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "120"))
 
-def summarize_chunk(chunk: str, chunk_index: int) -> str:
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+_client = None
+_client_lock = threading.Lock()
+# When any call gets rate limited, every worker holds off until this time
+_rate_limited_until = 0.0
+# Opened by outages (connection errors, timeouts, 5xx), not by rate limits, which have their own backoff
+_breaker = get_breaker("openai")
+# Tokens billed by OpenAI (cache hits cost nothing and aren't counted); streamed replies report no usage
+_usage = {"completions": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+def _is_outage(error: Exception) -> bool:
+    return isinstance(error, (APIConnectionError, InternalServerError))
+
+def get_openai_client() -> OpenAI:
+    """
+    One client (and one pooled HTTP connection set) shared by every summarization in the process.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    timeout=OPENAI_TIMEOUT_SECONDS,
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(
+                            max_connections=SUMMARY_MAX_IN_FLIGHT * 4,
+                            max_keepalive_connections=SUMMARY_MAX_IN_FLIGHT * 2
+                        )
+                    )
+                )
+    return _client
+
+def _retry_after_seconds(error: RateLimitError, attempt: int) -> float:
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return min(2 ** attempt, 30)
+
+def _chat_completion(**kwargs) -> str:
+    # Identical requests (same sanitized text, template, model and params) are answered from the cache
+    cache_key = make_cache_key(**kwargs)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached
+    content = _create_completion(**kwargs)
+    store_response(cache_key, kwargs["model"], content)
+    return content
+
+def _create_completion(**kwargs) -> str:
+    global _rate_limited_until
+    for attempt in range(SUMMARY_RATE_LIMIT_RETRIES + 1):
+        delay = _rate_limited_until - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            response = _breaker.call(get_openai_client().chat.completions.create, is_failure=_is_outage, **kwargs)
+            _usage["completions"] += 1
+            if response.usage is not None:
+                _usage["prompt_tokens"] += response.usage.prompt_tokens
+                _usage["completion_tokens"] += response.usage.completion_tokens
+            return response.choices[0].message.content.strip()
+        except RateLimitError as e:
+            if attempt == SUMMARY_RATE_LIMIT_RETRIES:
+                raise
+            wait_seconds = _retry_after_seconds(e, attempt)
+            print(f"[DEBUG] OpenAI rate limit hit, backing off {wait_seconds:.1f}s")
+            _rate_limited_until = max(_rate_limited_until, time.time() + wait_seconds)
+
+def _stream_chat_completion(**kwargs) -> Iterator[str]:
+    """
+    Like _chat_completion but yields the reply as it is generated. A cache hit is yielded whole; a
+    fresh reply is cached once complete. Rate limits are only retried before the first token.
+    """
+    global _rate_limited_until
+    cache_key = make_cache_key(**kwargs)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    for attempt in range(SUMMARY_RATE_LIMIT_RETRIES + 1):
+        delay = _rate_limited_until - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            stream = _breaker.call(
+                get_openai_client().chat.completions.create, stream=True, is_failure=_is_outage, **kwargs
+            )
+            break
+        except RateLimitError as e:
+            if attempt == SUMMARY_RATE_LIMIT_RETRIES:
+                raise
+            wait_seconds = _retry_after_seconds(e, attempt)
+            print(f"[DEBUG] OpenAI rate limit hit, backing off {wait_seconds:.1f}s")
+            _rate_limited_until = max(_rate_limited_until, time.time() + wait_seconds)
+
+    parts = []
+    for event in stream:
+        if not event.choices:
+            continue
+        delta = event.choices[0].delta.content
+        if delta:
+            # Leading whitespace is dropped, as .strip() does for non-streamed replies
+            if not parts:
+                delta = delta.lstrip()
+                if not delta:
+                    continue
+            parts.append(delta)
+            yield delta
+    store_response(cache_key, kwargs["model"], "".join(parts).strip())
+
+def split_transcript_into_chunks(text: str, max_tokens: int = CHUNK_MAX_TOKENS):
+    # Token-budgeted and section-aware; yields chunks lazily instead of building a word list
+    return iter_token_chunks(text, max_tokens=max_tokens)
+
+def _chunk_request(chunk: str, chunk_index: int) -> dict:
     prompt = (
         f"You are a financial analyst. This is part {chunk_index} of an earnings call transcript.\n"
         "Summarize any financial results, EPS, revenue, forward guidance, and any quotes from the CEO/CFO.\n\n"
         f"Chunk:\n{chunk}"
     )
 
-    response = client.chat.completions.create(
+    return dict(
         model="gpt-3.5-turbo",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.3,
         max_tokens=400
     )
 
-    return response.choices[0].message.content.strip()
+def summarize_chunk(chunk: str, chunk_index: int) -> str:
+    return _chat_completion(**_chunk_request(chunk, chunk_index))
 
-def combine_chunk_summaries(summaries: list) -> str:
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def _combine_request(summaries: list) -> dict:
     combined_prompt = (
         "You are a senior financial analyst. Given the following summaries of an earnings call, "
         "write a final, concise summary with all key results (EPS, revenue, guidance), and tone of the call.\n\n"
     )
     combined_prompt += "\n\n".join([f"Part {i+1}:\n{summary}" for i, summary in enumerate(summaries)])
 
-    response = client.chat.completions.create(
+    return dict(
         model="gpt-3.5-turbo",
         messages=[{"role": "user", "content": combined_prompt}],
         temperature=0.3,
         max_tokens=500
     )
 
-    return response.choices[0].message.content.strip()
+def _prompt_version() -> str:
+    # The chunk and combine requests with empty inputs: a new prompt, model or parameter changes the digest
+    requests = [_chunk_request("", 0), _combine_request([])]
+    return hashlib.sha256(json.dumps(requests, sort_keys=True).encode("utf-8")).hexdigest()[:16]
 
-def summarize_transcript(transcript_text: str, ticker: str) -> str:
+# Section summaries made under another version are not reused for other filings (see find_summary_by_hash)
+SUMMARY_PROMPT_VERSION = _prompt_version()
+
+def combine_chunk_summaries(summaries: list) -> str:
+    return _chat_completion(**_combine_request(summaries))
+
+def _group_for_combine(summaries: list, max_tokens: int) -> list:
+    groups, current, current_tokens = [], [], 0
+    for summary in summaries:
+        tokens = count_tokens(summary)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def _reduce_for_final_combine(summaries: list, executor: ThreadPoolExecutor) -> list:
+    # Combines in parallel groups until what's left fits one combine prompt (or can't shrink further)
+    while True:
+        groups = _group_for_combine(summaries, COMBINE_MAX_TOKENS)
+        # With one summary per group every summary is already over budget, so another round can't help
+        if len(groups) <= 1 or len(groups) == len(summaries):
+            return summaries
+        print(f"[DEBUG] Reducing {len(summaries)} partial summaries in {len(groups)} groups")
+        summaries = list(executor.map(combine_chunk_summaries, groups))
+
+def reduce_summaries(summaries: list, executor: ThreadPoolExecutor) -> str:
+    """
+    Combines partial summaries, first in parallel groups if together they'd overflow the combine prompt.
+    Group order follows chunk order, so the final summary is deterministic in its inputs.
+    """
+    return combine_chunk_summaries(_reduce_for_final_combine(summaries, executor))
+
+def summarize_transcript(transcript_text: str, ticker: str, on_progress: Callable[[str], None] = None) -> str:
     # ✅ sanitize before doing anything
-    cleaned_text = sanitize_transcript(transcript_text)
-    chunks = split_transcript_into_chunks(cleaned_text, max_words=2200)
-    partial_summaries = [summarize_chunk(chunk, i+1) for i, chunk in enumerate(chunks)]
-    final_summary = combine_chunk_summaries(partial_summaries)
+    cleaned_text = sanitize_paragraphs(transcript_text)
+    # executor.map submits every chunk up front anyway; materializing gives us the total for progress
+    chunks = list(split_transcript_into_chunks(cleaned_text))
+    report = on_progress or (lambda stage: None)
+    partial_summaries = []
+    with ThreadPoolExecutor(max_workers=SUMMARY_MAX_IN_FLIGHT, thread_name_prefix=f"summarize-{ticker}") as executor:
+        # map() yields results in chunk order regardless of completion order
+        for index, partial in enumerate(executor.map(summarize_chunk, chunks, itertools.count(1)), start=1):
+            partial_summaries.append(partial)
+            report(f"summarizing chunk {index}/{len(chunks)}")
+        report("combining summaries")
+        final_summary = reduce_summaries(partial_summaries, executor)
     return final_summary
+
+def summarize_sections(section_texts: dict, ticker: str, on_progress: Callable[[str], None] = None) -> tuple:
+    """
+    Summarizes several sections independently, with every chunk of every section sharing one executor.
+    A section that fits in one chunk is summarized by that chunk's call alone. Returns (summaries,
+    errors), both keyed by section, so one failing section doesn't throw away the others' work; every
+    section lands in exactly one of them.
+    """
+    report = on_progress or (lambda stage: None)
+    chunks = [
+        (code, index, chunk)
+        for code, text in section_texts.items()
+        for index, chunk in enumerate(split_transcript_into_chunks(sanitize_paragraphs(text)), start=1)
+    ]
+    partials = {code: {} for code, _, _ in chunks}
+    summaries = {}
+    # Nothing left after sanitizing means no chunks, so no partials entry to pick the section up later
+    errors = {code: ValueError(f"Section {code} has no text to summarize") for code in section_texts if code not in partials}
+    with ThreadPoolExecutor(max_workers=SUMMARY_MAX_IN_FLIGHT, thread_name_prefix=f"summarize-{ticker}") as executor:
+        futures = {executor.submit(summarize_chunk, chunk, index): (code, index) for code, index, chunk in chunks}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            code, index = futures[future]
+            try:
+                partials[code][index] = future.result()
+            except Exception as e:
+                errors[code] = e
+            report(f"summarizing chunk {completed}/{len(chunks)}")
+
+        report("combining section summaries")
+        for code, parts in partials.items():
+            if code in errors:
+                continue
+            ordered = [parts[index] for index in sorted(parts)]
+            try:
+                summaries[code] = ordered[0] if len(ordered) == 1 else reduce_summaries(ordered, executor)
+            except Exception as e:
+                errors[code] = e
+    return summaries, errors
+
+def combine_summaries(summaries: list) -> str:
+    with ThreadPoolExecutor(max_workers=SUMMARY_MAX_IN_FLIGHT) as executor:
+        return reduce_summaries(summaries, executor)
+
+def stream_summarize_transcript(transcript_text: str, ticker: str) -> Iterator[dict]:
+    """
+    summarize_transcript as a stream of events: {"type": "chunk", "index", "total", "summary"} for each
+    chunk summary as soon as it completes (any order), then {"type": "token", "text"} pieces of the
+    final combined summary as the model writes them, then {"type": "done", "summary"}.
+    """
+    cleaned_text = sanitize_paragraphs(transcript_text)
+    chunks = list(split_transcript_into_chunks(cleaned_text))
+    partial_summaries = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=SUMMARY_MAX_IN_FLIGHT, thread_name_prefix=f"summarize-{ticker}") as executor:
+        futures = {executor.submit(summarize_chunk, chunk, index): index for index, chunk in enumerate(chunks, start=1)}
+        for future in as_completed(futures):
+            index = futures[future]
+            partial_summaries[index - 1] = future.result()
+            yield {"type": "chunk", "index": index, "total": len(chunks), "summary": partial_summaries[index - 1]}
+        # Reduction still runs in chunk order, so the final summary matches summarize_transcript's
+        final_inputs = _reduce_for_final_combine(partial_summaries, executor)
+
+    parts = []
+    for text in _stream_chat_completion(**_combine_request(final_inputs)):
+        parts.append(text)
+        yield {"type": "token", "text": text}
+    yield {"type": "done", "summary": "".join(parts).strip()}
+
+def get_llm_usage_stats() -> dict:
+    return dict(_usage)
@@ -0,0 +1,85 @@
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+from datetime import date
+from typing import Optional
+from app.services.cache import REDIS_KEY_PREFIX, get_redis_client
+
+# Writers of summary and job rows announce "(ticker, filing_date) changed" here, so open
+# /summary-events streams re-read the DB only when there is something new to read
+SUMMARY_EVENTS_CHANNEL = f"{REDIS_KEY_PREFIX}:summary-events"
+
+_waiters = {}  # "TICKER:YYYY-MM-DD" -> {asyncio.Event: its event loop}
+_waiters_lock = threading.Lock()
+_listener_started = False
+
+def _event_key(ticker: str, filing_date: date) -> str:
+    return f"{ticker.strip().upper()}:{filing_date.isoformat()}"
+
+def publish_summary_event(ticker: str, filing_date: date):
+    """Best effort, and a no-op without Redis: streams fall back to polling the DB then."""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.publish(SUMMARY_EVENTS_CHANNEL, _event_key(ticker, filing_date))
+    except Exception as e:
+        print(f"[DEBUG] Could not publish summary event for {ticker} ({filing_date}): {e}")
+
+def _wake(key: Optional[str]):
+    # key None wakes every stream, e.g. after a reconnect during which messages may have been lost
+    with _waiters_lock:
+        if key is None:
+            waiters = [item for by_event in _waiters.values() for item in by_event.items()]
+        else:
+            waiters = list(_waiters.get(key, {}).items())
+    for event, loop in waiters:
+        loop.call_soon_threadsafe(event.set)
+
+def _listen_for_summary_events():
+    reconnecting = False
+    while True:
+        try:
+            pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(SUMMARY_EVENTS_CHANNEL)
+            if reconnecting:
+                _wake(None)
+                reconnecting = False
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    _wake(message["data"].decode())
+        except Exception as e:
+            print(f"[DEBUG] Summary event listener lost Redis ({e}), reconnecting in 5s")
+            reconnecting = True
+            time.sleep(5)
+
+def _start_listener():
+    global _listener_started
+    with _waiters_lock:
+        if not _listener_started:
+            threading.Thread(target=_listen_for_summary_events, daemon=True, name="summary-events").start()
+            _listener_started = True
+
+@contextmanager
+def subscribe(ticker: str, filing_date: date):
+    """
+    Yields an asyncio.Event that is set whenever (ticker, filing_date) changes; the caller clears it
+    before re-reading. Yields None when Redis isn't configured, and the caller has to poll instead.
+    Must be entered from the event loop the stream runs on.
+    """
+    if get_redis_client() is None:
+        yield None
+        return
+    _start_listener()
+    key, event = _event_key(ticker, filing_date), asyncio.Event()
+    with _waiters_lock:
+        _waiters.setdefault(key, {})[event] = asyncio.get_running_loop()
+    try:
+        yield event
+    finally:
+        with _waiters_lock:
+            _waiters[key].pop(event, None)
+            if not _waiters[key]:
+                del _waiters[key]
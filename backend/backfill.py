@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Backfills 10-Q summaries for many tickers: resolves every ticker's latest 10-Q up front, skips
+(ticker, filing_date) pairs that already have a summary (or are being generated), then runs fetch +
+summarize for the rest with bounded concurrency. Each pair's start and outcome are appended to a
+progress file, so rerunning after an interruption picks up where it stopped: pairs a killed run left
+at "generating..." (started, never finished, no job queued) are retried, known failures are not
+(unless --retry-failed). Ends with a throughput and OpenAI cost report.
+
+SEC and sec-api traffic is paced by the shared rate limiter, so raising --concurrency mostly buys
+overlap with the LLM calls. With --enqueue the pairs are queued for worker.py processes instead.
+
+Examples:
+    python backfill.py AAPL MSFT NVDA
+    python backfill.py --tickers-file sp500.txt --concurrency 8
+    python backfill.py --watchlist --enqueue
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor, as_completed
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.models import Summary, SummaryJob, Watchlist
+from app.services.cik_index import get_ciks
+from app.services.submissions import get_latest_filing
+from app.services.fetcher import (
+    claim_summary_generation, reclaim_failed_summary, normalize_summary_tickers, generate_and_save_summary,
+    record_summary_failure, summary_status
+)
+from app.services.jobs import enqueue_summary_job
+from app.services.summarizer import get_llm_usage_stats
+from app.services.llm_cache import get_llm_cache_stats
+
+# gpt-3.5-turbo list prices, USD per 1K tokens
+DEFAULT_PROMPT_COST_PER_1K = 0.0005
+DEFAULT_COMPLETION_COST_PER_1K = 0.0015
+# Ticker IN (...) lists are kept under common bind-parameter limits
+QUERY_BATCH_SIZE = 500
+
+def load_tickers(args) -> list:
+    tickers = list(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file) as f:
+            tickers += [word for line in f for word in line.replace(",", " ").split() if not word.startswith("#")]
+    if args.watchlist:
+        db = SessionLocal()
+        try:
+            tickers += [row.ticker for row in db.query(Watchlist.ticker).distinct()]
+        finally:
+            db.close()
+    return list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+
+def load_progress(path: str) -> dict:
+    """(ticker, filing_date) -> last recorded outcome, from an earlier run's progress file."""
+    progress = {}
+    if not os.path.exists(path):
+        return progress
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash
+            progress[(entry["ticker"], entry["filing_date"])] = entry["status"]
+    return progress
+
+def resolve_filings(tickers: list, concurrency: int) -> tuple:
+    """ticker -> (filing_url, filing_date) for tickers with a 10-Q, and ticker -> reason for the rest."""
+    ciks = get_ciks(tickers)
+    filings, unresolved = {}, {t: "no CIK" for t, cik in ciks.items() if not cik}
+    resolvable = {t: cik for t, cik in ciks.items() if cik}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(get_latest_filing, cik, "10-Q"): t for t, cik in resolvable.items()}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                filing = future.result()
+            except Exception as e:
+                unresolved[ticker] = f"filing lookup failed: {e}"
+                continue
+            if filing is None:
+                unresolved[ticker] = "no 10-Q"
+            else:
+                filings[ticker] = (filing["url"], date.fromisoformat(filing["filing_date"]))
+    return filings, unresolved
+
+def existing_statuses(filings: dict) -> tuple:
+    """
+    (ticker -> summary_status of the row for its resolved filing, for rows that exist; tickers whose
+    filing has a summary job). Expects legacy lower-case tickers to be normalized already.
+    """
+    tickers = list(filings)
+    statuses, with_jobs = {}, set()
+    db = SessionLocal()
+    try:
+        for i in range(0, len(tickers), QUERY_BATCH_SIZE):
+            batch = tickers[i:i + QUERY_BATCH_SIZE]
+            rows = db.query(Summary.ticker, Summary.filing_date, Summary.summary_text).filter(
+                Summary.ticker.in_(batch)
+            ).all()
+            for row in rows:
+                if filings[row.ticker][1] == row.filing_date:
+                    statuses[row.ticker] = summary_status(row.summary_text)
+            jobs = db.query(SummaryJob.ticker, SummaryJob.filing_date).filter(SummaryJob.ticker.in_(batch)).all()
+            with_jobs.update(job.ticker for job in jobs if filings[job.ticker][1] == job.filing_date)
+    finally:
+        db.close()
+    return statuses, with_jobs
+
+def summarize_pair(ticker: str, filing_url: str, filing_date: date, status: str) -> str:
+    """Generates and stores one summary. Returns "done", or "skipped" if another process holds it."""
+    if status == "failed":
+        # An earlier error row is reclaimed instead of claimed (the claim only inserts)
+        if not reclaim_failed_summary(ticker, filing_date):
+            return "skipped"
+    elif status != "interrupted" and not claim_summary_generation(ticker, filing_date):
+        # An interrupted pair's "generating..." row was claimed by an earlier run of this script
+        return "skipped"
+    try:
+        generate_and_save_summary(ticker, filing_date, filing_url, allow_partial=True)
+    except Exception as e:
+        record_summary_failure(ticker, filing_date, e)
+        raise
+    return "done"
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill 10-Q summaries for many tickers")
+    parser.add_argument("tickers", nargs="*", help="tickers to backfill")
+    parser.add_argument("--tickers-file", help="file of tickers, whitespace or comma separated")
+    parser.add_argument("--watchlist", action="store_true", help="add every watchlisted ticker")
+    parser.add_argument("--concurrency", type=int, default=4, help="tickers summarized at once")
+    parser.add_argument("--resolve-concurrency", type=int, default=8, help="filing lookups at once")
+    parser.add_argument("--progress-file", default="backfill_progress.jsonl",
+                        help="append-only log of started and finished pairs, used to resume")
+    parser.add_argument("--retry-failed", action="store_true", help="retry pairs that failed in an earlier run")
+    parser.add_argument("--enqueue", action="store_true", help="queue summary jobs for worker.py instead of running them here")
+    parser.add_argument("--dry-run", action="store_true", help="resolve and report what would run, then stop")
+    parser.add_argument("--prompt-cost-per-1k", type=float, default=DEFAULT_PROMPT_COST_PER_1K)
+    parser.add_argument("--completion-cost-per-1k", type=float, default=DEFAULT_COMPLETION_COST_PER_1K)
+    args = parser.parse_args()
+
+    tickers = load_tickers(args)
+    if not tickers:
+        parser.error("no tickers given (pass tickers, --tickers-file or --watchlist)")
+
+    started = time.perf_counter()
+    filings, unresolved = resolve_filings(tickers, args.resolve_concurrency)
+    print(f"Resolved {len(filings)}/{len(tickers)} tickers in {time.perf_counter() - started:.1f}s")
+    for ticker, reason in sorted(unresolved.items()):
+        print(f"  {ticker}: {reason}")
+
+    if not args.dry_run:
+        # Rows stored under a lower-case ticker would otherwise be seen here but missed by every write
+        normalize_summary_tickers()
+    statuses, with_jobs = existing_statuses(filings)
+    progress = load_progress(args.progress_file)
+    todo, skipped = [], {"ready": 0, "generating": 0, "failed earlier": 0}
+    for ticker, (filing_url, filing_date) in filings.items():
+        status = statuses.get(ticker, "missing")
+        last_outcome = progress.get((ticker, filing_date.isoformat()))
+        if status == "generating" and last_outcome == "started" and ticker not in with_jobs:
+            # Claimed by an earlier run that died before finishing; no job exists for the reaper to recover
+            todo.append((ticker, filing_url, filing_date, "interrupted"))
+        elif status in ("ready", "generating"):
+            skipped[status] += 1
+        elif last_outcome == "failed" and not args.retry_failed:
+            skipped["failed earlier"] += 1
+        else:
+            todo.append((ticker, filing_url, filing_date, status))
+    print(f"To summarize: {len(todo)}; skipped: " + ", ".join(f"{n} {k}" for k, n in skipped.items()))
+    if args.dry_run or not todo:
+        return
+
+    if args.enqueue:
+        queued = 0
+        for ticker, filing_url, filing_date, status in todo:
+            if status == "failed":
+                if not reclaim_failed_summary(ticker, filing_date):
+                    continue
+            elif status != "interrupted" and not claim_summary_generation(ticker, filing_date):
+                continue
+            queued += enqueue_summary_job(ticker, filing_date, filing_url)
+        print(f"Queued {queued} summary jobs for the workers")
+        return
+
+    usage_before, cache_before = get_llm_usage_stats(), get_llm_cache_stats()
+    outcomes = {"done": 0, "failed": 0, "skipped": 0}
+    log_lock = threading.Lock()
+    run_started = time.perf_counter()
+
+    with open(args.progress_file, "a") as log, ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        def log_progress(ticker: str, filing_date: date, status: str, error: str = None):
+            with log_lock:
+                log.write(json.dumps({"ticker": ticker, "filing_date": filing_date.isoformat(),
+                                      "status": status, "error": error}) + "\n")
+                log.flush()
+
+        def run_pair(ticker, filing_url, filing_date, status):
+            # Logged before the claim, so a rerun after a crash knows this run owned the placeholder
+            log_progress(ticker, filing_date, "started")
+            return summarize_pair(ticker, filing_url, filing_date, status)
+
+        futures = {executor.submit(run_pair, *pair): pair for pair in todo}
+        try:
+            for future in as_completed(futures):
+                ticker, _, filing_date, _ = futures[future]
+                error = None
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    outcome, error = "failed", str(e)
+                outcomes[outcome] += 1
+                log_progress(ticker, filing_date, outcome, error)
+                finished = sum(outcomes.values())
+                elapsed = time.perf_counter() - run_started
+                print(f"[{finished}/{len(todo)}] {ticker} {filing_date}: {outcome}"
+                      f"{f' ({error[:120]})' if error else ''} - {finished / elapsed * 60:.1f} tickers/min")
+        except KeyboardInterrupt:
+            print("Interrupted; waiting for summaries already in progress (rerun to resume)...")
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - run_started
+    usage_after, cache_after = get_llm_usage_stats(), get_llm_cache_stats()
+    prompt_tokens = usage_after["prompt_tokens"] - usage_before["prompt_tokens"]
+    completion_tokens = usage_after["completion_tokens"] - usage_before["completion_tokens"]
+    cost = prompt_tokens / 1000 * args.prompt_cost_per_1k + completion_tokens / 1000 * args.completion_cost_per_1k
+    done = outcomes["done"]
+
+    print("\n--- Backfill report ---")
+    print(f"Summarized: {done}, failed: {outcomes['failed']}, taken by another process: {outcomes['skipped']}")
+    print(f"Wall time: {elapsed:.1f}s ({done / elapsed * 60:.1f} summaries/min at concurrency {args.concurrency})")
+    print(f"LLM calls: {usage_after['completions'] - usage_before['completions']}, "
+          f"cache hits: {cache_after['hits'] - cache_before['hits']}")
+    print(f"Tokens: {prompt_tokens} prompt + {completion_tokens} completion")
+    print(f"Estimated OpenAI cost: ${cost:.4f}" + (f" (${cost / done:.4f} per summary)" if done else ""))
+
+if __name__ == "__main__":
+    main()
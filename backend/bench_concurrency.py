@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Concurrent load benchmark for the API. Fires requests at one or more paths with a fixed number of
+concurrent clients and prints latency percentiles, so runs before and after a change can be compared.
+
+Example:
+    python bench_concurrency.py --base-url http://localhost:8000 --token $ID_TOKEN \
+        --path /stock/AAPL --path / --concurrency 50 --requests 500
+"""
+import time
+import asyncio
+import argparse
+import statistics
+import httpx
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_path(client, path, concurrency, total):
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure API latency under concurrent load")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", action="append", help="path to request (repeatable)")
+    parser.add_argument("--token", help="Firebase ID token for authenticated endpoints")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500, help="requests per path")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, limits=limits, timeout=120) as client:
+        paths = args.path or ["/"]
+        # Run all paths at the same time: a slow path starving a fast one is exactly what we're measuring
+        results = await asyncio.gather(*(run_path(client, p, args.concurrency, args.requests) for p in paths))
+
+    print(f"{'path':<30} {'n':>6} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for path, (latencies, errors, elapsed) in zip(paths, results):
+        print(
+            f"{path:<30} {len(latencies):>6} {errors:>5} {len(latencies) / elapsed:>8.1f} "
+            f"{statistics.median(latencies):>9.1f} {percentile(latencies, 95):>9.1f} "
+            f"{percentile(latencies, 99):>9.1f} {max(latencies):>9.1f}"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for sanitize_transcript. Times the current implementation against the previous
+multi-pass one on the sample transcript and on a synthetic ~10 MB filing, and checks that both
+produce identical output.
+
+Example:
+    python bench_sanitizer.py --repeat 5 --synthetic-mb 10
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.sanitizer import sanitize_transcript
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testable_transcript_cleaned.txt")
+
+def sanitize_transcript_multipass(text: str) -> str:
+    # The previous implementation, kept here as the reference for output and timing
+    text = text.replace("“", "\"").replace("”", "\"")
+    text = text.replace("‘", "'").replace("’", "'")
+    text = text.replace("–", "-").replace(" ", " ")
+    text = re.sub(r"[\x00-\x08\x0B-\x1F\x7F]", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+def synthetic_filing(size_mb: float, seed: int = 0) -> str:
+    # Filing-like prose: smart quotes and dashes in the text, line breaks, tabbed tables and a form
+    # feed at every page break, the way EDGAR text exports look
+    rng = random.Random(seed)
+    words = ["revenue", "guidance", "EPS", "quarter", "operating", "margin", "“growth”", "company’s",
+             "2023–2024", "income", "tax", "cash", "flow", "the", "of", "and", "$1.2", "billion", "net"]
+    pieces, size, count = [], 0, 0
+    while size < size_mb * 1024 * 1024:
+        count += 1
+        if count % 4000 == 0:
+            separator = "\n\x0c\n"
+        elif count % 300 == 0:
+            separator = "\t\t"
+        elif count % 15 == 0:
+            separator = "\r\n"
+        else:
+            separator = " "
+        word = rng.choice(words)
+        pieces.append(word + separator)
+        size += len(word) + len(separator)
+    return "".join(pieces)
+
+def best_of(fn, text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sanitize_transcript")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per input; the best is reported")
+    parser.add_argument("--synthetic-mb", type=float, default=10)
+    args = parser.parse_args()
+
+    inputs = []
+    if os.path.exists(SAMPLE_PATH):
+        with open(SAMPLE_PATH, encoding="utf-8") as f:
+            inputs.append(("sample transcript", f.read()))
+    inputs.append((f"synthetic {args.synthetic_mb:g} MB", synthetic_filing(args.synthetic_mb)))
+
+    print(f"{'input':<22} {'chars':>11} {'old ms':>9} {'new ms':>9} {'speedup':>8} {'identical':>10}")
+    for name, text in inputs:
+        identical = sanitize_transcript(text) == sanitize_transcript_multipass(text)
+        old = best_of(sanitize_transcript_multipass, text, args.repeat)
+        new = best_of(sanitize_transcript, text, args.repeat)
+        print(f"{name:<22} {len(text):>11} {old * 1000:>9.1f} {new * 1000:>9.1f} {old / new:>7.2f}x {str(identical):>10}")
+
+if __name__ == "__main__":
+    main()
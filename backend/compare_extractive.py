@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Compares summarizing a filing's full text with summarizing its extractively pre-ranked text: tokens
+and LLM calls for each, how many of the filing's figures survive pre-ranking and, with --summarize,
+how close the pre-ranked summary comes to the full-text one.
+
+Examples:
+    python compare_extractive.py --ticker AAPL
+    python compare_extractive.py --text-file testable_transcript_cleaned.txt --budget 800 --summarize
+"""
+import os
+import re
+import sys
+import time
+import argparse
+from collections import Counter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.chunker import count_tokens, iter_token_chunks
+from app.services.sanitizer import sanitize_paragraphs
+from app.services.extractive import prerank_sections
+
+_FIGURE = re.compile(r"\d[\d,]*(?:\.\d+)?%?")
+_WORD = re.compile(r"[a-z0-9$%.]+")
+
+def combine_sections(sections: dict) -> str:
+    return "\n\n".join(f"## Section: {code}\n{content}" for code, content in sections.items())
+
+def llm_calls(text: str) -> int:
+    # One call per chunk plus at least one combine
+    return sum(1 for _ in iter_token_chunks(sanitize_paragraphs(text))) + 1
+
+def figure_recall(reference: str, candidate: str) -> float:
+    figures = set(_FIGURE.findall(reference))
+    return len(figures & set(_FIGURE.findall(candidate))) / len(figures) if figures else 1.0
+
+def unigram_f1(reference: str, candidate: str) -> float:
+    ref, cand = Counter(_WORD.findall(reference.lower())), Counter(_WORD.findall(candidate.lower()))
+    overlap = sum((ref & cand).values())
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / sum(cand.values()), overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+def load_sections(args) -> dict:
+    if args.text_file:
+        with open(args.text_file, encoding="utf-8") as f:
+            return {os.path.basename(args.text_file): f.read()}
+    from app.services.fetcher import get_latest_10q_filing_url, fetch_all_important_sections
+    filing_url = get_latest_10q_filing_url(args.ticker)
+    sections = fetch_all_important_sections(args.ticker, filing_url)["sections"]
+    return {code: content for code, content in sections.items() if not content.startswith("Error:")}
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text vs pre-ranked summarization comparison")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--ticker", help="fetch the latest 10-Q sections for this ticker")
+    source.add_argument("--text-file", help="use a local text file as a single section")
+    parser.add_argument("--budget", type=int, help="per-section token budget (default EXTRACTIVE_SECTION_TOKEN_BUDGET)")
+    parser.add_argument("--summarize", action="store_true", help="also run both summaries through the LLM")
+    args = parser.parse_args()
+
+    sections = load_sections(args)
+    ranked = prerank_sections(sections, args.budget)
+
+    print(f"{'section':<36} {'full tokens':>12} {'ranked tokens':>14} {'figures kept':>13}")
+    for code in sections:
+        print(f"{code:<36} {count_tokens(sections[code]):>12} {count_tokens(ranked[code]):>14} "
+              f"{figure_recall(sections[code], ranked[code]):>12.0%}")
+
+    full_text, ranked_text = combine_sections(sections), combine_sections(ranked)
+    full_calls, ranked_calls = llm_calls(full_text), llm_calls(ranked_text)
+    print(f"\nLLM calls: {full_calls} full vs {ranked_calls} pre-ranked ({full_calls / ranked_calls:.1f}x fewer)")
+
+    if args.summarize:
+        from app.services.summarizer import summarize_transcript
+        name = args.ticker or "text"
+        started = time.perf_counter()
+        full_summary = summarize_transcript(full_text, name)
+        full_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        ranked_summary = summarize_transcript(ranked_text, name)
+        ranked_seconds = time.perf_counter() - started
+
+        print(f"Time: {full_seconds:.1f}s full vs {ranked_seconds:.1f}s pre-ranked")
+        print(f"Summary figures also in the full-text summary: {figure_recall(full_summary, ranked_summary):.0%}")
+        print(f"Unigram F1 against the full-text summary: {unigram_f1(full_summary, ranked_summary):.2f}")
+        print(f"\n--- Full-text summary ---\n{full_summary}\n\n--- Pre-ranked summary ---\n{ranked_summary}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Every test module shares one engine, built on first import of app.database: point it at a throwaway
+# SQLite file before anything is collected, never at the configured database
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
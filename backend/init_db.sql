@@ -32,11 +32,57 @@ CREATE TABLE IF NOT EXISTS watchlist (
     user_id INTEGER REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- Create LLM response cache table (content-addressed, see app/services/llm_cache.py)
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    model VARCHAR(255),
+    response_text TEXT,
+    size_bytes INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_accessed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create per-section extraction and summary table (see app/services/sections.py)
+CREATE TABLE IF NOT EXISTS filing_sections (
+    id SERIAL PRIMARY KEY,
+    accession VARCHAR(25) NOT NULL,
+    item_code VARCHAR(20) NOT NULL,
+    content_hash VARCHAR(64) NOT NULL,
+    content TEXT,
+    summary_text TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    summarized_at TIMESTAMP,
+    UNIQUE(accession, item_code)
+);
+
+-- Create summary job queue table (consumed by worker.py)
+CREATE TABLE IF NOT EXISTS summary_jobs (
+    id SERIAL PRIMARY KEY,
+    ticker VARCHAR(10) NOT NULL,
+    filing_date DATE NOT NULL,
+    filing_url TEXT,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    progress VARCHAR(100),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(255),
+    locked_at TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    UNIQUE(ticker, filing_date)
+);
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_summaries_ticker ON summaries(ticker);
 CREATE INDEX IF NOT EXISTS idx_summaries_filing_date ON summaries(filing_date);
 CREATE INDEX IF NOT EXISTS idx_watchlist_user_id ON watchlist(user_id);
 CREATE INDEX IF NOT EXISTS idx_watchlist_ticker ON watchlist(ticker);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_accessed_at ON llm_cache(last_accessed_at);
+CREATE INDEX IF NOT EXISTS idx_filing_sections_content_hash ON filing_sections(content_hash);
+CREATE INDEX IF NOT EXISTS idx_summary_jobs_status_run_after ON summary_jobs(status, run_after);
 
 -- Grant permissions
 GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO finagent_user;
@@ -0,0 +1,106 @@
+"""
+SQLite-backed checks of backfill.py's resume logic: which pairs a rerun skips, retries or reclaims.
+Runs under pytest or directly: python test_backfill.py
+"""
+import os
+import sys
+import json
+import tempfile
+from datetime import date
+
+# Always a throwaway SQLite file: these tests drop and recreate every table (conftest.py does the same
+# under pytest, before any module has built the engine)
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test_backfill.db"
+
+import backfill
+from app import models
+from app.database import Base, engine, SessionLocal
+from app.services.fetcher import reclaim_failed_summary, update_summary_in_db
+from app.services.jobs import enqueue_summary_job
+
+FILING_DATE = date(2024, 5, 1)
+
+def reset_db(*rows):
+    assert engine.dialect.name == "sqlite"
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.add_all(rows)
+    db.commit()
+    db.close()
+
+def run_backfill(tickers: list, progress_entries: list = (), extra_args: list = ()) -> list:
+    """Runs backfill.main() with the SEC lookup and the summarizer stubbed; returns the pairs it generated."""
+    progress_path = os.path.join(tempfile.mkdtemp(), "progress.jsonl")
+    with open(progress_path, "w") as f:
+        for ticker, status in progress_entries:
+            f.write(json.dumps({"ticker": ticker, "filing_date": FILING_DATE.isoformat(), "status": status}) + "\n")
+    generated = []
+
+    def fake_generate(ticker, filing_date, filing_url, allow_partial):
+        generated.append(ticker)
+        update_summary_in_db(ticker, filing_date, f"summary of {ticker}")
+
+    originals = backfill.resolve_filings, backfill.generate_and_save_summary, sys.argv
+    backfill.resolve_filings = lambda tickers, concurrency: ({t: ("https://example/10q", FILING_DATE) for t in tickers}, {})
+    backfill.generate_and_save_summary = fake_generate
+    sys.argv = ["backfill.py", *tickers, "--progress-file", progress_path, *extra_args]
+    try:
+        backfill.main()
+    finally:
+        backfill.resolve_filings, backfill.generate_and_save_summary, sys.argv = originals
+    return sorted(generated)
+
+def stored_summaries() -> list:
+    # Read from the DB, not get_summary_text: its cache outlives each test's tables
+    db = SessionLocal()
+    try:
+        return db.query(models.Summary.ticker, models.Summary.summary_text).order_by(models.Summary.ticker).all()
+    finally:
+        db.close()
+
+def summary(ticker: str, text: str) -> models.Summary:
+    return models.Summary(ticker=ticker, filing_date=FILING_DATE, summary_text=text)
+
+def test_skips_ready_and_active_pairs():
+    reset_db(summary("AAPL", "done"), summary("MSFT", "generating..."))
+    assert run_backfill(["AAPL", "MSFT", "NVDA"]) == ["NVDA"]
+
+def test_retries_interrupted_pair_without_a_job():
+    reset_db(summary("AAPL", "generating..."), summary("MSFT", "generating..."))
+    enqueue_summary_job("MSFT", FILING_DATE, "https://example/10q")
+    # Both were started by a run that died; only AAPL has nothing (no job) to recover it
+    assert run_backfill(["AAPL", "MSFT"], [("AAPL", "started"), ("MSFT", "started")]) == ["AAPL"]
+    assert stored_summaries() == [("AAPL", "summary of AAPL"), ("MSFT", "generating...")]
+
+def test_failed_earlier_needs_retry_failed():
+    reset_db(summary("AAPL", "Error generating summary: boom"))
+    assert run_backfill(["AAPL"], [("AAPL", "failed")]) == []
+    assert run_backfill(["AAPL"], [("AAPL", "failed")], ["--retry-failed"]) == ["AAPL"]
+    assert stored_summaries() == [("AAPL", "summary of AAPL")]
+
+def test_lower_case_failed_row_is_retried_and_saved():
+    # Written by /stock/aapl before tickers were normalized
+    reset_db(summary("aapl", "Error generating summary: boom"))
+    assert run_backfill(["AAPL"]) == ["AAPL"]
+    assert stored_summaries() == [("AAPL", "summary of AAPL")]
+
+def test_lower_case_duplicate_keeps_the_better_row():
+    reset_db(summary("aapl", "done"), summary("AAPL", "generating..."))
+    assert run_backfill(["AAPL"]) == []
+    assert stored_summaries() == [("AAPL", "done")]
+
+def test_failed_row_is_reclaimed_once():
+    reset_db(summary("AAPL", "Error generating summary: boom"))
+    assert reclaim_failed_summary("AAPL", FILING_DATE)
+    assert not reclaim_failed_summary("aapl", FILING_DATE)
+    assert stored_summaries() == [("AAPL", "generating...")]
+
+if __name__ == "__main__":
+    test_skips_ready_and_active_pairs()
+    test_retries_interrupted_pair_without_a_job()
+    test_failed_earlier_needs_retry_failed()
+    test_lower_case_failed_row_is_retried_and_saved()
+    test_lower_case_duplicate_keeps_the_better_row()
+    test_failed_row_is_reclaimed_once()
+    print("ok")
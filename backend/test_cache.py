@@ -0,0 +1,66 @@
+"""
+Checks of the local LRU and the local + Redis tiered cache (fakeredis standing in for Redis).
+Runs under pytest or directly: python test_cache.py
+"""
+import time
+import redis
+import fakeredis
+from app.services import cache
+
+def test_local_cache_evicts_least_recently_used_and_expires():
+    local = cache.LocalCache("test-local", max_entries=2)
+    local.set("a", 1)
+    local.set("b", 2)
+    local.get("a")
+    local.set("c", 3)
+    assert local.get("b") is None and local.get("a") == 1 and local.get("c") == 3
+    local.set("short", 1, ttl=0.05)
+    time.sleep(0.1)
+    assert local.get("short") is None
+
+def test_tiered_cache_fills_l1_from_redis():
+    client = fakeredis.FakeRedis()
+    writer = cache.TieredCache("test-fill", 10, client)
+    reader = cache.TieredCache("test-fill", 10, client)
+    writer.set("AAPL", {"price": 1.5}, ttl=60)
+    assert reader.get("AAPL") == {"price": 1.5}
+    assert reader.stats["l2_hits"] == 1
+    client.flushall()
+    # Served from L1 now
+    assert reader.get("AAPL") == {"price": 1.5}
+
+def test_write_in_another_process_invalidates_l1():
+    client = fakeredis.FakeRedis()
+    saved_client, saved_id = cache._redis_client, cache._process_id
+    cache._redis_client = client
+    try:
+        mine = cache.get_cache("test-invalidate", 10)
+        mine.set("AAPL", "old")
+        # Another process: same Redis, its own process id
+        cache._process_id = "other-process"
+        cache.TieredCache("test-invalidate", 10, client).set("AAPL", "new")
+        cache._process_id = saved_id
+        deadline = time.time() + 5
+        while mine.local.get("AAPL") is not None and time.time() < deadline:
+            time.sleep(0.05)
+        assert mine.get("AAPL") == "new"
+        assert mine.stats["invalidations_received"] == 1
+    finally:
+        cache._redis_client, cache._process_id = saved_client, saved_id
+        cache._caches.pop("test-invalidate", None)
+
+def test_redis_errors_degrade_to_l1():
+    # Nothing listens on port 1
+    unreachable = redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.1)
+    broken = cache.TieredCache("test-broken", 10, unreachable)
+    broken.set("AAPL", "value")
+    assert broken.get("AAPL") == "value"
+    assert broken.get("MSFT") is None
+    assert broken.stats["l2_errors"] == 2
+
+if __name__ == "__main__":
+    test_local_cache_evicts_least_recently_used_and_expires()
+    test_tiered_cache_fills_l1_from_redis()
+    test_write_in_another_process_invalidates_l1()
+    test_redis_errors_degrade_to_l1()
+    print("ok")
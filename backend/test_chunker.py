@@ -0,0 +1,51 @@
+"""
+Checks that chunking after sanitizing (the path summarize_transcript and summarize_sections take)
+still breaks at paragraph boundaries. Runs under pytest or directly: python test_chunker.py
+"""
+from app.services.sanitizer import sanitize_transcript, sanitize_paragraphs
+from app.services.summarizer import split_transcript_into_chunks
+from app.services.chunker import count_tokens
+
+def make_paragraph(index: int, sentences: int = 12) -> str:
+    return " ".join(f"Paragraph {index} sentence {n} reports “revenue” of $1.{n} billion." for n in range(sentences))
+
+def test_sanitizer_collapses_all_whitespace():
+    text = "First  line\r\n  continues\x0c here.\n \t\n\nSecond\tparagraph.\n\n\n"
+    assert sanitize_transcript(text) == "First line continues here. Second paragraph."
+
+def test_sanitize_paragraphs_keeps_paragraph_breaks():
+    text = "First  line\r\n  continues\x0c here.\n \t\n\nSecond\tparagraph.\n\n\n"
+    assert sanitize_paragraphs(text) == "First line continues here.\n\nSecond paragraph."
+    assert sanitize_paragraphs("no  breaks\there") == sanitize_transcript("no  breaks\there")
+
+def test_chunks_end_at_paragraph_boundaries():
+    paragraphs = [make_paragraph(i) for i in range(12)]
+    raw = "\r\n\r\n".join(p.replace(". ", ".\n", 3) for p in paragraphs)
+    per_paragraph = count_tokens(sanitize_transcript(paragraphs[0]))
+    # Room for about two and a half paragraphs, so a sentence-level split would be possible
+    max_tokens = int(per_paragraph * 2.5)
+
+    chunks = list(split_transcript_into_chunks(sanitize_paragraphs(raw), max_tokens))
+    expected = [sanitize_transcript(p) for p in paragraphs]
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert count_tokens(chunk) <= max_tokens
+        # Every chunk is a run of whole paragraphs, still separated by blank lines
+        assert chunk.split("\n\n") == [p for p in expected if p in chunk]
+    assert "\n\n".join(chunks) == "\n\n".join(expected)
+
+def test_split_paragraph_continues_with_a_space():
+    # A paragraph too big for one chunk is split by sentence; only a new paragraph gets a blank line
+    long_paragraph = make_paragraph(0, sentences=40)
+    text = sanitize_paragraphs(long_paragraph + "\n\n" + make_paragraph(1, sentences=2))
+    chunks = list(split_transcript_into_chunks(text, count_tokens(make_paragraph(0)) * 2))
+    assert len(chunks) > 1
+    assert "\n\n" not in chunks[0]
+    assert chunks[-1].endswith("\n\n" + sanitize_transcript(make_paragraph(1, sentences=2)))
+
+if __name__ == "__main__":
+    test_sanitizer_collapses_all_whitespace()
+    test_sanitize_paragraphs_keeps_paragraph_breaks()
+    test_chunks_end_at_paragraph_boundaries()
+    test_split_paragraph_continues_with_a_space()
+    print("ok")
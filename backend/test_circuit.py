@@ -0,0 +1,75 @@
+"""
+Checks of the per-upstream circuit breaker: opening, the half-open probe and outcomes that don't count.
+Runs under pytest or directly: python test_circuit.py
+"""
+import time
+from app.services.circuit import CircuitBreaker, CircuitOpenError
+
+def fail():
+    raise ConnectionError("down")
+
+def rejected(breaker: CircuitBreaker) -> bool:
+    try:
+        breaker.before_call()
+    except CircuitOpenError:
+        return True
+    return False
+
+def test_opens_after_consecutive_failures_and_closes_on_a_good_probe():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=0.1)
+    for _ in range(3):
+        try:
+            breaker.call(fail)
+        except ConnectionError:
+            pass
+    assert breaker.state == "open" and rejected(breaker)
+    time.sleep(0.15)
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed" and breaker.stats["trips"] == 1
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.1)
+    breaker.record_failure()
+    time.sleep(0.15)
+    breaker.before_call()
+    assert breaker.state == "half_open" and rejected(breaker)
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+def test_answers_that_are_not_outages_do_not_count():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=30)
+    try:
+        breaker.call(lambda: {}["missing"], is_failure=lambda e: not isinstance(e, KeyError))
+    except KeyError:
+        pass
+    assert breaker.state == "closed"
+
+def test_a_probe_that_never_reports_back_does_not_wedge_the_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.1)
+    breaker.record_failure()
+    time.sleep(0.15)
+    breaker.before_call()  # the probe's caller dies before recording an outcome
+    assert rejected(breaker)
+    time.sleep(0.15)
+    assert not rejected(breaker)
+
+def test_base_exceptions_release_the_probe():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    breaker.state, breaker._opened_at = "half_open", 0.0
+
+    def interrupted():
+        raise KeyboardInterrupt
+    try:
+        breaker.call(interrupted)
+    except KeyboardInterrupt:
+        pass
+    assert breaker.state == "half_open" and not rejected(breaker)
+
+if __name__ == "__main__":
+    test_opens_after_consecutive_failures_and_closes_on_a_good_probe()
+    test_half_open_lets_one_probe_through()
+    test_answers_that_are_not_outages_do_not_count()
+    test_a_probe_that_never_reports_back_does_not_wedge_the_circuit()
+    test_base_exceptions_release_the_probe()
+    print("ok")
@@ -0,0 +1,146 @@
+"""
+SQLite-backed checks of the summary job queue: enqueue, claiming, retries and the stale job reaper.
+Runs under pytest or directly: python test_jobs.py
+"""
+import os
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+
+# Always a throwaway SQLite file: these tests drop and recreate every table
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test_jobs.db"
+
+from app import models
+from app.database import Base, engine, SessionLocal
+from app.services import jobs
+
+FILING_DATE = date(2024, 5, 1)
+
+def reset_db(*rows):
+    assert engine.dialect.name == "sqlite"
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.add_all(rows)
+    db.commit()
+    db.close()
+
+def load_job(ticker: str = "AAPL") -> models.SummaryJob:
+    db = SessionLocal()
+    job = db.query(models.SummaryJob).filter_by(ticker=ticker, filing_date=FILING_DATE).one()
+    db.expunge(job)
+    db.close()
+    return job
+
+def summary_text(ticker: str = "AAPL") -> str:
+    db = SessionLocal()
+    row = db.query(models.Summary.summary_text).filter_by(ticker=ticker, filing_date=FILING_DATE).first()
+    db.close()
+    return row.summary_text if row else None
+
+def running_job(locked_minutes_ago: int, attempts: int, ticker: str = "AAPL") -> models.SummaryJob:
+    locked_at = datetime.utcnow() - timedelta(minutes=locked_minutes_ago)
+    return models.SummaryJob(ticker=ticker, filing_date=FILING_DATE, status="running", attempts=attempts,
+                             max_attempts=3, run_after=locked_at, locked_by="gone:1:0", locked_at=locked_at)
+
+def test_enqueue_is_idempotent_until_the_job_finishes():
+    reset_db()
+    assert jobs.enqueue_summary_job("aapl", FILING_DATE)
+    assert not jobs.enqueue_summary_job("AAPL", FILING_DATE)
+    job = jobs.claim_next_job("w1")
+    assert not jobs.enqueue_summary_job("AAPL", FILING_DATE)
+    jobs.complete_job(job.id)
+    assert jobs.enqueue_summary_job("AAPL", FILING_DATE)
+    assert load_job().status == "queued" and load_job().attempts == 0
+
+def test_a_job_is_claimed_once():
+    reset_db()
+    jobs.enqueue_summary_job("AAPL", FILING_DATE)
+    job = jobs.claim_next_job("w1")
+    assert job.ticker == "AAPL" and job.status == "running" and job.attempts == 1 and job.locked_by == "w1"
+    assert jobs.claim_next_job("w2") is None
+
+def test_concurrent_workers_never_share_a_job():
+    reset_db()
+    tickers = [f"T{i}" for i in range(20)]
+    for ticker in tickers:
+        jobs.enqueue_summary_job(ticker, FILING_DATE)
+    claimed, lock = [], threading.Lock()
+
+    def work(worker_id):
+        # A lost race returns None even with jobs left, so keep polling until the queue is drained
+        while True:
+            job = jobs.claim_next_job(worker_id)
+            if job is not None:
+                with lock:
+                    claimed.append(job.ticker)
+            elif not jobs.get_job_stats()["by_status"].get("queued"):
+                return
+
+    workers = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert sorted(claimed) == sorted(tickers)
+
+def test_claim_skips_jobs_waiting_out_a_backoff():
+    reset_db(models.SummaryJob(ticker="AAPL", filing_date=FILING_DATE, status="queued", attempts=1,
+                               max_attempts=3, run_after=datetime.utcnow() + timedelta(minutes=5)))
+    assert jobs.claim_next_job("w1") is None
+
+def test_failed_attempts_are_retried_until_max_attempts():
+    reset_db()
+    jobs.enqueue_summary_job("AAPL", FILING_DATE)
+    for attempt in range(1, 4):
+        job = jobs.claim_next_job("w1")
+        assert job.attempts == attempt
+        assert jobs.fail_job(job.id, "boom") == (attempt < 3)
+        if attempt < 3:
+            assert load_job().status == "queued"
+            # Skip the backoff
+            db = SessionLocal()
+            db.query(models.SummaryJob).update({"run_after": datetime.utcnow()})
+            db.commit()
+            db.close()
+    assert load_job().status == "failed" and load_job().last_error == "boom"
+
+def test_reaper_requeues_stale_jobs_and_fails_exhausted_ones():
+    reset_db(
+        running_job(locked_minutes_ago=60, attempts=1, ticker="AAPL"),
+        running_job(locked_minutes_ago=60, attempts=3, ticker="MSFT"),
+        running_job(locked_minutes_ago=1, attempts=1, ticker="NVDA"),
+        models.Summary(ticker="MSFT", filing_date=FILING_DATE, summary_text="generating..."),
+    )
+    assert jobs.reap_stale_jobs() == 2
+
+    requeued = load_job("AAPL")
+    assert requeued.status == "queued" and requeued.locked_by is None
+    exhausted = load_job("MSFT")
+    assert exhausted.status == "failed"
+    assert summary_text("MSFT").startswith("Error generating summary")
+    # Still within JOB_STALE_AFTER_SECONDS: its worker is presumed alive
+    assert load_job("NVDA").status == "running"
+
+def test_reaper_queues_orphaned_placeholders():
+    old = datetime.utcnow() - timedelta(hours=2)
+    reset_db(
+        models.Summary(ticker="AAPL", filing_date=FILING_DATE, summary_text="generating...", created_at=old),
+        models.Summary(ticker="MSFT", filing_date=FILING_DATE, summary_text="generating...",
+                       created_at=datetime.utcnow()),
+    )
+    assert jobs.reap_stale_jobs() == 1
+    assert load_job("AAPL").status == "queued"
+    db = SessionLocal()
+    assert db.query(models.SummaryJob).filter_by(ticker="MSFT").first() is None
+    db.close()
+
+if __name__ == "__main__":
+    test_enqueue_is_idempotent_until_the_job_finishes()
+    test_a_job_is_claimed_once()
+    test_concurrent_workers_never_share_a_job()
+    test_claim_skips_jobs_waiting_out_a_backoff()
+    test_failed_attempts_are_retried_until_max_attempts()
+    test_reaper_requeues_stale_jobs_and_fails_exhausted_ones()
+    test_reaper_queues_orphaned_placeholders()
+    print("ok")
@@ -0,0 +1,95 @@
+"""
+Checks of the shared SEC client: GCRA pacing (local and on Redis, via fakeredis) and how throttling,
+outages and limiter errors reach the host's circuit. No network: the session is stubbed.
+Runs under pytest or directly: python test_sec_http.py
+"""
+import io
+import fakeredis
+import requests
+from app.services import sec_http
+from app.services.circuit import CircuitBreaker, CircuitOpenError
+
+URL = "https://www.sec.gov/cgi-bin/browse-edgar"
+
+def response(status: int) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp.raw = io.BytesIO(b"")
+    return resp
+
+class StubSession:
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return response(self.statuses.pop(0))
+
+class BrokenLimiter:
+    def acquire(self):
+        raise RuntimeError("redis down")
+
+def with_stubs(session, breaker, limiter=None, fn=None):
+    saved = sec_http._session, dict(sec_http._breakers), dict(sec_http._limiters), sec_http._backoff_seconds
+    sec_http._session = session
+    sec_http._breakers["sec"] = breaker
+    sec_http._limiters["sec"] = limiter or sec_http.TokenBucket("sec", 1000)
+    sec_http._backoff_seconds = lambda attempt, response=None: 0
+    try:
+        return fn()
+    finally:
+        sec_http._session, breakers, limiters, sec_http._backoff_seconds = saved
+        sec_http._breakers.update(breakers)
+        sec_http._limiters.update(limiters)
+
+def check_pacing(bucket: sec_http.TokenBucket):
+    # A burst of 1 at 10/s: the first call goes at once, each later one is due 100ms after the previous
+    delays = [bucket._reserve() for _ in range(3)]
+    assert delays[0] <= 0
+    assert 0.08 < delays[1] < 0.12 and 0.18 < delays[2] < 0.22
+
+def test_local_bucket_paces_calls():
+    check_pacing(sec_http.TokenBucket("test", 10, burst=1))
+
+def test_redis_bucket_paces_calls():
+    bucket = sec_http.RedisTokenBucket("test", 10, fakeredis.FakeRedis(), burst=1)
+    check_pacing(bucket)
+    assert bucket.stats["redis_errors"] == 0
+
+def test_throttling_is_retried_without_tripping_the_circuit():
+    breaker = CircuitBreaker("sec", failure_threshold=2, reset_seconds=30)
+    session = StubSession(429, 429, 429, 200)
+    result = with_stubs(session, breaker, fn=lambda: sec_http.sec_get(URL))
+    assert result.status_code == 200 and session.calls == 4
+    assert breaker.state == "closed" and breaker.stats["failures"] == 0
+
+def test_server_errors_open_the_circuit():
+    breaker = CircuitBreaker("sec", failure_threshold=2, reset_seconds=30)
+    session = StubSession(503, 503, 200)
+    try:
+        with_stubs(session, breaker, fn=lambda: sec_http.sec_get(URL))
+        assert False, "expected the circuit to open"
+    except CircuitOpenError:
+        pass
+    assert session.calls == 2
+
+def test_a_limiter_error_does_not_keep_the_probe():
+    breaker = CircuitBreaker("sec", failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    breaker.state = "half_open"
+    try:
+        with_stubs(StubSession(200), breaker, BrokenLimiter(), fn=lambda: sec_http.sec_get(URL))
+    except RuntimeError:
+        pass
+    # The next call may probe again instead of being rejected for good
+    assert with_stubs(StubSession(200), breaker, fn=lambda: sec_http.sec_get(URL)).status_code == 200
+    assert breaker.state == "closed"
+
+if __name__ == "__main__":
+    test_local_bucket_paces_calls()
+    test_redis_bucket_paces_calls()
+    test_throttling_is_retried_without_tripping_the_circuit()
+    test_server_errors_open_the_circuit()
+    test_a_limiter_error_does_not_keep_the_probe()
+    print("ok")
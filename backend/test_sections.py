@@ -0,0 +1,41 @@
+"""
+SQLite-backed checks of reusing a stored section summary for identical content in another filing.
+Runs under pytest or directly: python test_sections.py
+"""
+import os
+import tempfile
+
+# Always a throwaway SQLite file: these tests drop and recreate every table
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test_sections.db"
+
+from app.database import Base, engine
+from app.services.sections import find_summary_by_hash, store_section, store_section_summary
+
+BOILERPLATE = "Legal proceedings: see Note 9. Nothing material changed this quarter."
+
+def reset_db():
+    assert engine.dialect.name == "sqlite"
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+def test_hash_hit_needs_the_same_section_and_version():
+    reset_db()
+    digest = store_section("0000320193-24-000001", "part2item1", BOILERPLATE)
+    store_section_summary("0000320193-24-000001", "part2item1", digest, "No new litigation.", "v1")
+
+    assert find_summary_by_hash("part2item1", digest, "v1") == "No new litigation."
+    # Same text filed under another item, or summarized with another prompt, is summarized afresh
+    assert find_summary_by_hash("part2item1a", digest, "v1") is None
+    assert find_summary_by_hash("part2item1", digest, "v2") is None
+
+def test_changed_content_drops_its_summary_version():
+    reset_db()
+    digest = store_section("0000320193-24-000001", "part2item1", BOILERPLATE)
+    store_section_summary("0000320193-24-000001", "part2item1", digest, "No new litigation.", "v1")
+    store_section("0000320193-24-000001", "part2item1", BOILERPLATE + " A new suit was filed.")
+    assert find_summary_by_hash("part2item1", digest, "v1") is None
+
+if __name__ == "__main__":
+    test_hash_hit_needs_the_same_section_and_version()
+    test_changed_content_drops_its_summary_version()
+    print("ok")
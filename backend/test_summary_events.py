@@ -0,0 +1,70 @@
+"""
+Checks that /stock/{ticker}/summary-events is pushed summary changes over Redis pub/sub (fakeredis here)
+instead of polling, and still polls the DB when Redis isn't configured.
+Runs under pytest or directly: python test_summary_events.py
+"""
+import os
+import sys
+import types
+import asyncio
+import tempfile
+import threading
+from datetime import date, datetime
+
+# Always a throwaway SQLite file: these tests drop and recreate every table
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test_summary_events.db"
+if "app.firebase_config" not in sys.modules:
+    # The real module initializes the Firebase Admin SDK from credentials at import time
+    sys.modules["app.firebase_config"] = types.SimpleNamespace(verify_token=lambda: None)
+
+import fakeredis
+from app import models
+from app.database import Base, engine, SessionLocal
+from app.routers import stock_details
+from app.services import cache
+from app.services.fetcher import update_summary_in_db
+
+FILING_DATE = date(2024, 5, 1)
+
+def reset_db():
+    assert engine.dialect.name == "sqlite"
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.add(models.Summary(ticker="AAPL", filing_date=FILING_DATE, summary_text="generating...",
+                          created_at=datetime.utcnow()))
+    db.commit()
+    db.close()
+
+def collect_events(redis_client, poll_seconds: float, timeout: float) -> list:
+    """Opens the stream, writes the summary from another thread once it is open, returns the event names."""
+    cache._redis_client = redis_client
+    stock_details.SUMMARY_EVENTS_POLL_SECONDS = poll_seconds
+    response = stock_details.summary_events("AAPL", filing_date=FILING_DATE, current_user={})
+
+    async def read():
+        events = []
+        async for chunk in response.body_iterator:
+            events.append(chunk.split("\n", 1)[0].removeprefix("event: "))
+            if len(events) == 1:
+                threading.Timer(0.2, update_summary_in_db, ("AAPL", FILING_DATE, "Quarter was fine.")).start()
+        return events
+
+    try:
+        return asyncio.run(asyncio.wait_for(read(), timeout))
+    finally:
+        cache._redis_client = None
+
+def test_summary_write_is_pushed_to_the_stream():
+    reset_db()
+    # Polling would not get to the second read within the timeout: only the publish can wake the stream
+    assert collect_events(fakeredis.FakeRedis(), poll_seconds=60, timeout=5) == ["status", "done"]
+
+def test_stream_polls_without_redis():
+    reset_db()
+    assert collect_events(None, poll_seconds=0.1, timeout=5) == ["status", "done"]
+
+if __name__ == "__main__":
+    test_summary_write_is_pushed_to_the_stream()
+    test_stream_polls_without_redis()
+    print("ok")
@@ -0,0 +1,87 @@
+"""
+SQLite-backed checks of upsert_user and the uid -> user id cache behind get_current_user_id.
+Runs under pytest or directly: python test_users.py
+"""
+import os
+import sys
+import types
+import tempfile
+
+# Always a throwaway SQLite file: these tests drop and recreate every table
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test_users.db"
+if "app.firebase_config" not in sys.modules:
+    # The real module initializes the Firebase Admin SDK from credentials at import time
+    sys.modules["app.firebase_config"] = types.SimpleNamespace(verify_token=lambda: None)
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from app import dependencies
+from app.database import Base, engine, SessionLocal
+
+def reset_db():
+    assert engine.dialect.name == "sqlite"
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    dependencies._user_ids.clear()
+
+def count_writes(fn) -> int:
+    statements = []
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+            statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(statements)
+
+def test_existing_user_is_found_without_writing():
+    reset_db()
+    db = SessionLocal()
+    created = dependencies.upsert_user(db, "uid-1", "a@example.com")
+    writes = count_writes(lambda: dependencies.upsert_user(db, "uid-1", "a@example.com"))
+    assert writes == 0
+    assert dependencies.upsert_user(db, "uid-1", "a@example.com").id == created.id
+    db.close()
+
+def test_email_of_another_uid_is_a_conflict():
+    reset_db()
+    db = SessionLocal()
+    dependencies.upsert_user(db, "uid-1", "a@example.com")
+    try:
+        dependencies.upsert_user(db, "uid-2", "a@example.com")
+        assert False, "expected a 409"
+    except HTTPException as e:
+        assert e.status_code == 409
+    db.close()
+
+def test_users_without_email_get_their_own_rows():
+    reset_db()
+    db = SessionLocal()
+    first = dependencies.upsert_user(db, "phone-1", "")
+    second = dependencies.upsert_user(db, "phone-2", "")
+    assert first.id != second.id and first.email is None
+    db.close()
+
+def test_uid_cache_evicts_least_recently_used():
+    reset_db()
+    db = SessionLocal()
+    original_max = dependencies.USER_ID_CACHE_MAX_ENTRIES
+    dependencies.USER_ID_CACHE_MAX_ENTRIES = 2
+    try:
+        for uid in ("u1", "u2"):
+            dependencies.get_current_user_id({"uid": uid, "email": ""}, db)
+        dependencies.get_current_user_id({"uid": "u1", "email": ""}, db)  # u1 is now the most recent
+        dependencies.get_current_user_id({"uid": "u3", "email": ""}, db)
+        assert list(dependencies._user_ids) == ["u1", "u3"]
+    finally:
+        dependencies.USER_ID_CACHE_MAX_ENTRIES = original_max
+        db.close()
+
+if __name__ == "__main__":
+    test_existing_user_is_found_without_writing()
+    test_email_of_another_uid_is_a_conflict()
+    test_users_without_email_get_their_own_rows()
+    test_uid_cache_evicts_least_recently_used()
+    print("ok")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Summary job worker: pulls jobs from the summary_jobs table and runs fetch + summarize for them.
+Run as many of these as you need, independently of the API processes.
+"""
+import sys
+import os
+import time
+import socket
+import argparse
+import threading
+import traceback
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.jobs import claim_next_job, complete_job, fail_job, reap_stale_jobs, set_job_progress
+from app.services.fetcher import generate_and_save_summary, record_summary_failure
+
+def run_job(job):
+    print(f"[WORKER] Job {job.id}: {job.ticker} ({job.filing_date}), attempt {job.attempts}/{job.max_attempts}")
+    started = time.time()
+    try:
+        # Progress lands on the job row, where /stock/{ticker}/summary-events picks it up
+        generate_and_save_summary(
+            job.ticker, job.filing_date, job.filing_url,
+            on_progress=lambda stage: set_job_progress(job.id, stage),
+            # Until the last attempt, a section that failed to extract fails the job so a retry can pick
+            # it up; one the filing simply doesn't have is left out on the first attempt
+            allow_partial=job.attempts >= job.max_attempts
+        )
+        complete_job(job.id)
+        print(f"[WORKER] Job {job.id} done in {time.time() - started:.1f}s")
+    except Exception as e:
+        print(f"[WORKER ERROR] Job {job.id} failed: {e}")
+        print(f"[WORKER ERROR] Full traceback: {traceback.format_exc()}")
+        if not fail_job(job.id, str(e)):
+            # Out of retries: surface the error to users the same way the old background task did
+            record_summary_failure(job.ticker, job.filing_date, e)
+
+def worker_loop(worker_id: str, poll_interval: float, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            job = claim_next_job(worker_id)
+        except Exception as e:
+            print(f"[WORKER ERROR] {worker_id} could not poll for jobs: {e}")
+            job = None
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        run_job(job)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run summary jobs from the database queue")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("WORKER_CONCURRENCY", "2")),
+                        help="jobs processed in parallel by this process")
+    parser.add_argument("--poll-interval", type=float, default=float(os.getenv("WORKER_POLL_INTERVAL", "2")),
+                        help="seconds to wait when the queue is empty")
+    parser.add_argument("--reap-interval", type=float, default=float(os.getenv("WORKER_REAP_INTERVAL", "60")),
+                        help="seconds between stale job sweeps")
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    base_id = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(target=worker_loop, args=(f"{base_id}:{i}", args.poll_interval, stop), daemon=True)
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    print(f"[WORKER] Started {args.concurrency} worker threads as {base_id}")
+
+    try:
+        while True:
+            try:
+                reap_stale_jobs()
+            except Exception as e:
+                print(f"[WORKER ERROR] Reaper failed: {e}")
+            time.sleep(args.reap_interval)
+    except KeyboardInterrupt:
+        print("[WORKER] Shutting down, waiting for running jobs...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+if __name__ == "__main__":
+    main()
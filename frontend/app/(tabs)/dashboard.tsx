@@ -1,15 +1,24 @@
 import React, { useEffect, useState } from 'react';
 import { View, Text, FlatList, StyleSheet, ActivityIndicator, TouchableOpacity, TextInput, Modal } from 'react-native';
 import { getAuth } from 'firebase/auth';
-import { addToWatchlist, deleteFromWatchlist, fetchYahooFinancePrices, getWatchlist } from '../../services/api.js';
+import { addToWatchlist, deleteFromWatchlist, getWatchlistDashboard } from '../../services/api.js';
 import { Swipeable } from 'react-native-gesture-handler';
 import { useRouter } from 'expo-router';
 
+interface Quote {
+  price: number;
+  change: number;
+  changePercent: number;
+  error?: string;
+}
+
 interface WatchlistItem {
   id: number;
   ticker: string;
   added_at: string;
   user_id: number;
+  quote?: Quote;
+  summary?: { filing_date: string | null; status: string; created_at: string | null };
 }
 
 const DashboardScreen = () => {
@@ -20,7 +29,6 @@ const DashboardScreen = () => {
   const [modalVisible, setModalVisible] = useState(false);
   const [newTicker, setNewTicker] = useState('');
   const [adding, setAdding] = useState(false);
-  const [prices, setPrices] = useState<{ [key: string]: { price: number, change: number, changePercent: number } }>({});
 
   // Mock price change data for UI
   const mockPriceChange = (ticker: string): string => {
@@ -39,7 +47,8 @@ const DashboardScreen = () => {
       const user = getAuth().currentUser;
       if (!user) throw new Error('User not authenticated');
       const token = await user.getIdToken();
-      const data = await getWatchlist(token);
+      // One request brings back the watchlist, quotes and summary status together
+      const data = await getWatchlistDashboard(token);
       setWatchlist(data);
     } catch (err: any) {
       setError(err.message);
@@ -48,26 +57,10 @@ const DashboardScreen = () => {
     }
   };
 
-  const fetchPrices = async (tickers: string[]) => {
-    try {
-      const priceData = await fetchYahooFinancePrices(tickers);
-      console.log('yfinance data:', priceData);
-      setPrices(priceData as { [key: string]: { price: number, change: number, changePercent: number } });
-    } catch (err) {
-      console.error('yfinance error:', err);
-    }
-  };
-
   useEffect(() => {
     fetchWatchlist();
   }, []);
 
-  useEffect(() => {
-    if (watchlist.length > 0) {
-      fetchPrices(watchlist.map(item => item.ticker));
-    }
-  }, [watchlist]);
-
   const handleAddStock = async () => {
     if (!newTicker.trim()) return;
     setAdding(true);
@@ -129,7 +122,8 @@ const DashboardScreen = () => {
         data={watchlist}
         keyExtractor={(item) => item.id.toString()}
         renderItem={({ item }) => {
-          const priceInfo = prices[item.ticker.toUpperCase()];
+          const quote = item.quote;
+          const priceInfo = quote && !quote.error ? quote : undefined;
           const priceChange = priceInfo ? priceInfo.changePercent.toFixed(1) : '--';
           const isPositive = priceInfo ? priceInfo.changePercent > 0 : false;
           return (
@@ -2,7 +2,7 @@ import React, { useEffect, useState, useRef } from 'react';
 import { View, Text, StyleSheet, ScrollView, ActivityIndicator } from 'react-native';
 import { useLocalSearchParams } from 'expo-router';
 import { getAuth } from 'firebase/auth';
-import { fetchStockDetails } from '../../services/api.js';
+import { fetchStockDetails, subscribeToSummaryEvents } from '../../services/api.js';
 
 interface StockDetails {
   price: number;
@@ -13,6 +13,7 @@ interface StockDetails {
   eps: number;
   volume: number;
   summary: string;
+  filingDate: string | null;
 }
 
 export default function StockDetailsScreen() {
@@ -20,12 +21,13 @@ export default function StockDetailsScreen() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [stockDetails, setStockDetails] = useState<StockDetails | null>(null);
-  const pollingIntervalRef = useRef<number | null>(null);
+  const [progress, setProgress] = useState<string | null>(null);
+  const unsubscribeRef = useRef<(() => void) | null>(null);
 
-  const stopPolling = () => {
-    if (pollingIntervalRef.current) {
-      clearInterval(pollingIntervalRef.current);
-      pollingIntervalRef.current = null;
+  const stopListening = () => {
+    if (unsubscribeRef.current) {
+      unsubscribeRef.current();
+      unsubscribeRef.current = null;
     }
   };
 
@@ -39,27 +41,26 @@ export default function StockDetailsScreen() {
         const details = await fetchStockDetails(ticker as string, token);
         setStockDetails(details);
         
-        stopPolling();
+        stopListening();
 
         if (details.summary === "generating...") {
-          pollingIntervalRef.current = setInterval(async () => {
-            try {
-              console.log(`Polling for ${ticker} summary...`);
-              const updatedDetails = await fetchStockDetails(ticker as string, token);
-              if (updatedDetails.summary !== "generating...") {
-                setStockDetails(updatedDetails);
-                stopPolling();
-              }
-            } catch (pollError) {
-              console.error("Polling failed:", pollError);
-              setError("Failed to retrieve summary.");
-              stopPolling();
+          // The server pushes progress and the finished summary; no re-fetching of /stock/{ticker}
+          unsubscribeRef.current = subscribeToSummaryEvents(ticker as string, details.filingDate, token, (event: string, data: any) => {
+            if (event === 'status') {
+              setProgress(data.progress || data.status);
+            } else if (event === 'done') {
+              setStockDetails(prev => prev ? { ...prev, summary: data.summary } : prev);
+              stopListening();
+            } else {
+              console.error("Summary stream ended:", event, data);
+              setStockDetails(prev => prev ? { ...prev, summary: data.error || "Could not load AI summary." } : prev);
+              stopListening();
             }
-          }, 5000);
+          });
         }
       } catch (err: any) {
         setError(err.message);
-        stopPolling();
+        stopListening();
       } finally {
         setLoading(false);
       }
@@ -67,7 +68,7 @@ export default function StockDetailsScreen() {
 
     getDetails();
 
-    return () => stopPolling();
+    return () => stopListening();
   }, [ticker]);
 
   if (loading) {
@@ -134,7 +135,7 @@ export default function StockDetailsScreen() {
           {stockDetails.summary === "generating..." ? (
             <View style={styles.generatingContainer}>
               <ActivityIndicator color="#00bfff" />
-              <Text style={styles.generatingText}>AI analysis in progress...</Text>
+              <Text style={styles.generatingText}>AI analysis in progress{progress ? `: ${progress}` : '...'}</Text>
             </View>
           ) : (
             <Text style={styles.summaryText}>{stockDetails.summary}</Text>
@@ -36,6 +36,20 @@ export async function getWatchlist(token) {
     return await res.json();
 }
 
+// Watchlist items with their quote and latest summary status, in one request
+export async function getWatchlistDashboard(token) {
+    const res = await fetch(`${API_BASE_URL}/watchlist/dashboard`, {
+        headers: {
+            'Authorization': `Bearer ${token}`,
+        },
+    });
+    if (!res.ok) {
+        const errorText = await res.text();
+        throw new Error(errorText || 'Failed to fetch dashboard');
+    }
+    return await res.json();
+}
+
 export async function addToWatchlist(ticker, token) {
   try {
     const res = await fetch(`${API_BASE_URL}/watchlist`, {
@@ -102,3 +116,34 @@ export async function fetchStockDetails(ticker, token) {
   return response.json();
 }
 
+// Subscribes to /stock/{ticker}/summary-events (Server-Sent Events). React Native has no EventSource,
+// so this reads the stream through XMLHttpRequest progress events. Returns a function that closes it.
+export function subscribeToSummaryEvents(ticker, filingDate, token, onEvent) {
+  const xhr = new XMLHttpRequest();
+  let seen = 0;
+  let buffer = '';
+
+  xhr.onprogress = () => {
+    buffer += xhr.responseText.slice(seen);
+    seen = xhr.responseText.length;
+    const messages = buffer.split('\n\n');
+    buffer = messages.pop();
+    for (const message of messages) {
+      let event = 'message';
+      let data = '';
+      for (const line of message.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  };
+  xhr.onerror = () => onEvent('error', { error: 'Lost connection to summary updates' });
+
+  const query = filingDate ? `?filing_date=${filingDate}` : '';
+  xhr.open('GET', `${API_BASE_URL}/stock/${ticker}/summary-events${query}`);
+  xhr.setRequestHeader('Authorization', `Bearer ${token}`);
+  xhr.setRequestHeader('Accept', 'text/event-stream');
+  xhr.send();
+  return () => xhr.abort();
+}